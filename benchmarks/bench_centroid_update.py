@@ -0,0 +1,83 @@
+"""
+bench_centroid_update.py
+
+Times the per-cluster sum strategies behind `update_centroids` against the
+baseline per-cluster mask loop, over a grid of (n, d, k) shapes. "default"
+is `update_centroids` as dispatched, "no-scipy" the dispatch without SciPy;
+the speedup column is against the slower of the two.
+
+Usage:
+    python benchmarks/bench_centroid_update.py --repeats 3
+
+Project: NumPyMasterPro
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts import kmeans_utils  # noqa: E402
+
+SHAPES = [
+    (200_000, 2, 3),
+    (500_000, 8, 8),
+    (200_000, 16, 100),
+    (1_000_000, 64, 32),
+    (100_000, 32, 1000),
+    (200_000, 256, 256),
+]
+
+
+def baseline(X, labels, k):
+    """The original update: one boolean mask and mean per cluster."""
+    return np.array([X[labels == i].mean(axis=0) for i in range(k)])
+
+
+def best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--dtype", default="float64")
+    args = parser.parse_args()
+
+    strategies = ["one_hot", "segments", "bincount"]
+    if kmeans_utils.sparse is not None:
+        strategies.insert(0, "sparse")
+    rng = np.random.default_rng(0)
+
+    header = f"{'n':>9}{'d':>5}{'k':>6}{'baseline':>10}" + "".join(f"{s:>10}" for s in strategies)
+    print(header + f"{'default':>10}{'no-scipy':>10}{'speedup':>9}")
+    for n, d, k in SHAPES:
+        X = rng.standard_normal((n, d)).astype(args.dtype)
+        labels = rng.integers(0, k, n)
+        row = f"{n:>9}{d:>5}{k:>6}"
+        base = best_time(lambda: baseline(X, labels, k), args.repeats)
+        row += f"{base:>10.3f}"
+        for name in strategies:
+            fn = getattr(kmeans_utils, f"_cluster_sums_{name}")
+            row += f"{best_time(lambda: fn(X, labels, k, None), args.repeats):>10.3f}"
+        default = best_time(lambda: kmeans_utils.update_centroids(X, labels, k), args.repeats)
+        scipy_sparse, kmeans_utils.sparse = kmeans_utils.sparse, None
+        try:
+            fallback = best_time(lambda: kmeans_utils.update_centroids(X, labels, k), args.repeats)
+        finally:
+            kmeans_utils.sparse = scipy_sparse
+        speedup = base / max(default, fallback)
+        print(row + f"{default:>10.3f}{fallback:>10.3f}{speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bench_kmeans_algorithms.py
+
+Compares wall time of `kmeans` with algorithm="lloyd", "elkan" and
+"hamerly" from the same initial centroids, and the share of point-centroid
+distances each bound-based algorithm skips.
+
+Usage:
+    python benchmarks/bench_kmeans_algorithms.py --n-samples 100000 --n-features 32 --k 256
+
+Author: Satvik Praveen
+Project: NumPyMasterPro
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.kmeans_utils import kmeans, make_blobs  # noqa: E402
+
+ALGORITHMS = ("lloyd", "elkan", "hamerly")
+
+
+def run(X, init, algorithm, max_iters):
+    """Returns (wall time in seconds, labels, fraction of distances skipped)."""
+    start = time.perf_counter()
+    _, labels, info = kmeans(X, k=len(init), init=init, max_iters=max_iters, tol=0,
+                             algorithm=algorithm, return_info=True)
+    seconds = time.perf_counter() - start
+    skipped = sum(info["distances_skipped"]) / (len(X) * len(init) * info["n_iter"])
+    return seconds, labels, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--n-samples", type=int, default=100_000)
+    parser.add_argument("--n-features", type=int, default=32)
+    parser.add_argument("--k", type=int, default=256)
+    parser.add_argument("--max-iters", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    X, _ = make_blobs(args.n_samples, args.n_features, k=args.k, random_state=0)
+    init = X[np.random.default_rng(1).choice(len(X), args.k, replace=False)].copy()
+
+    # Interleave the algorithms so machine noise hits all of them alike
+    times = {algorithm: [] for algorithm in ALGORITHMS}
+    skipped = {}
+    for _ in range(args.repeats):
+        for algorithm in ALGORITHMS:
+            seconds, labels, skipped[algorithm] = run(X, init, algorithm, args.max_iters)
+            times[algorithm].append(seconds)
+            if algorithm == "lloyd":
+                reference = labels
+            elif not np.array_equal(labels, reference):
+                print(f"warning: {algorithm} labels differ from lloyd")
+
+    print(f"n={args.n_samples} d={args.n_features} k={args.k}, "
+          f"{args.max_iters} iterations, best of {args.repeats}\n")
+    print(f"{'algorithm':<10}{'time (s)':>12}{'skipped':>10}{'speedup':>10}")
+    lloyd = min(times["lloyd"])
+    for algorithm in ALGORITHMS:
+        seconds = min(times[algorithm])
+        print(f"{algorithm:<10}{seconds:>12.3f}{skipped[algorithm]:>10.1%}{lloyd / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+bench_kmeans_dtype.py
+
+Compares peak memory and wall time of `kmeans` in float64 and float32.
+
+Usage:
+    python benchmarks/bench_kmeans_dtype.py --n-samples 200000 --n-features 64 --k 32
+
+Author: Satvik Praveen
+Project: NumPyMasterPro
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.kmeans_utils import kmeans  # noqa: E402
+
+
+def run(X, k, dtype, repeats):
+    """Returns (best wall time in seconds, peak traced memory in MiB)."""
+    X = X.astype(dtype)
+    init = X[:k].copy()
+    times = []
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        kmeans(X, k=k, init=init, max_iters=20, tol=0)
+        times.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return min(times), (peak + X.nbytes) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n-samples", type=int, default=200_000)
+    parser.add_argument("--n-features", type=int, default=64)
+    parser.add_argument("--k", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((args.n_samples, args.n_features))
+
+    print(f"n={args.n_samples} d={args.n_features} k={args.k}, 20 Lloyd iterations\n")
+    print(f"{'dtype':<10}{'time (s)':>12}{'peak MiB':>12}")
+    results = {}
+    for dtype in (np.float64, np.float32):
+        results[dtype] = run(X, args.k, dtype, args.repeats)
+        seconds, peak = results[dtype]
+        print(f"{np.dtype(dtype).name:<10}{seconds:>12.3f}{peak:>12.1f}")
+
+    (t64, m64), (t32, m32) = results[np.float64], results[np.float32]
+    print(f"\nfloat32 speedup: {t64 / t32:.2f}x, memory: {m32 / m64:.0%} of float64")
+
+
+if __name__ == "__main__":
+    main()
@@ -90,12 +90,26 @@ from .logical_utils import (
 # K-Means Utilities
 from .kmeans_utils import (
     kmeans,
+    minibatch_kmeans,
+    kmeans_memmap,
+    kmeans_data_parallel,
+    KMeansModel,
+    KMeansTrace,
+    OnlineKMeans,
     initialize_centroids,
     assign_clusters,
     update_centroids,
     compute_inertia,
     compute_cluster_inertia,
+    compress_duplicates,
+    build_coreset,
+    kmeans_coreset,
+    compute_streaming_inertia,
+    silhouette_score,
+    davies_bouldin_score,
+    calinski_harabasz_score,
     generate_data,
+    make_blobs,
 )
 
 # I/O Utilities
@@ -108,6 +122,25 @@ from .io_utils import (
     load_txt,
     create_memmap,
     load_memmap,
+    iter_csv_chunks,
+    read_memmap_meta,
+    append_memmap_rows,
+    map_blocks,
+    LazyNpzFile,
+    load_npz_lazy,
+    save_npz_aligned,
+    NpyAppendWriter,
+    load_csv_cached,
+    clear_csv_cache,
+    iter_batches,
+)
+
+# Chunked Array Store
+from .chunked_store import (
+    ChunkedArray,
+    save_chunked,
+    open_chunked,
+    load_chunked,
 )
 
 __version__ = "1.0.0"
@@ -173,12 +206,26 @@ __all__ = [
     "classify_scores",
     # K-Means
     "kmeans",
+    "minibatch_kmeans",
+    "kmeans_memmap",
+    "kmeans_data_parallel",
+    "KMeansModel",
+    "KMeansTrace",
+    "OnlineKMeans",
     "initialize_centroids",
     "assign_clusters",
     "update_centroids",
     "compute_inertia",
     "compute_cluster_inertia",
+    "compress_duplicates",
+    "build_coreset",
+    "kmeans_coreset",
+    "compute_streaming_inertia",
+    "silhouette_score",
+    "davies_bouldin_score",
+    "calinski_harabasz_score",
     "generate_data",
+    "make_blobs",
     # I/O
     "save_npy",
     "load_npy",
@@ -188,4 +235,20 @@ __all__ = [
     "load_txt",
     "create_memmap",
     "load_memmap",
+    "iter_csv_chunks",
+    "read_memmap_meta",
+    "append_memmap_rows",
+    "map_blocks",
+    "LazyNpzFile",
+    "load_npz_lazy",
+    "save_npz_aligned",
+    "NpyAppendWriter",
+    "load_csv_cached",
+    "clear_csv_cache",
+    "iter_batches",
+    # Chunked array store
+    "ChunkedArray",
+    "save_chunked",
+    "open_chunked",
+    "load_chunked",
 ]
@@ -0,0 +1,302 @@
+"""
+chunked_store.py
+
+Compressed, chunked on-disk array store with random access.
+
+Arrays are split along axis 0 into fixed-size chunks of rows; each chunk is
+compressed on its own with stdlib zlib or lzma. A chunk index at the end of
+the file maps chunk number -> (offset, size), so reading a slice only
+decompresses the chunks it touches. Both codecs release the GIL, so chunks
+are compressed and decompressed on a thread pool.
+
+File layout (all integers little-endian):
+
+    magic (8 bytes) | header length (uint32) | JSON header
+    chunk 0 | chunk 1 | ... | chunk n-1
+    index: n x (offset uint64, nbytes uint64)
+    index offset (uint64) | magic (8 bytes)
+
+Project: NumPyMasterPro
+"""
+
+import json
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MAGIC = b"NPCHUNK\x01"
+VERSION = 1
+CODECS = ("zlib", "lzma", "none")
+_INDEX_DTYPE = np.dtype([("offset", "<u8"), ("nbytes", "<u8")])
+_FOOTER = struct.Struct("<Q8s")
+
+
+def _n_threads(n_jobs):
+    if n_jobs is None:
+        # Codecs release the GIL, so a few threads overlap even on small machines
+        return min(8, (os.cpu_count() or 1) + 4)
+    return max(1, n_jobs if n_jobs > 0 else os.cpu_count() or 1)
+
+
+def _compress(raw, codec, level):
+    if codec == "zlib":
+        return zlib.compress(raw, 6 if level is None else level)
+    if codec == "lzma":
+        return lzma.compress(raw, preset=6 if level is None else level)
+    return bytes(raw)
+
+
+def _decompress(blob, codec):
+    if codec == "zlib":
+        return zlib.decompress(blob)
+    if codec == "lzma":
+        return lzma.decompress(blob)
+    return blob
+
+
+def save_chunked(path, arr, chunk_rows=None, codec="zlib", level=None, n_jobs=None):
+    """
+    Writes `arr` to a chunked, compressed store.
+
+    `arr` may be a memmap: chunks are read, compressed and written one window
+    at a time, so memory stays bounded by a few chunks.
+
+    Parameters:
+    - path (str or os.PathLike): Output file
+    - arr (array-like): Array with at least one dimension
+    - chunk_rows (int, optional): Rows per chunk (default: ~1 MiB of raw data)
+    - codec (str): "zlib", "lzma" or "none"
+    - level (int, optional): Compression level / lzma preset
+    - n_jobs (int, optional): Compression threads (default: min(8, CPUs + 4);
+      -1 for all CPUs)
+
+    Returns:
+    - int: Number of chunks written
+    """
+    if codec not in CODECS:
+        raise ValueError(f"❌ Unknown codec '{codec}'. Use one of {CODECS}.")
+    arr = arr if isinstance(arr, np.ndarray) else np.asarray(arr)
+    if arr.ndim == 0:
+        raise ValueError("❌ Chunked store needs an array with at least one dimension.")
+    if arr.dtype.hasobject:
+        raise ValueError("❌ Object arrays cannot be stored.")
+    row_bytes = max(1, arr.dtype.itemsize * int(np.prod(arr.shape[1:])))
+    if chunk_rows is None:
+        chunk_rows = max(1, (1 << 20) // row_bytes)
+    if chunk_rows < 1:
+        raise ValueError("❌ chunk_rows must be a positive integer.")
+
+    header = json.dumps({
+        "version": VERSION, "shape": list(arr.shape),
+        "dtype": np.lib.format.dtype_to_descr(arr.dtype),
+        "chunk_rows": int(chunk_rows), "codec": codec,
+    }).encode()
+    n_threads = _n_threads(n_jobs)
+
+    def encode(start):
+        block = np.ascontiguousarray(arr[start:start + chunk_rows])
+        return _compress(block.reshape(-1).view(np.uint8), codec, level)
+
+    index = []
+    with open(path, "wb") as f, ThreadPoolExecutor(max_workers=n_threads) as pool:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        pending = deque()
+
+        def drain():
+            blob = pending.popleft().result()
+            index.append((f.tell(), len(blob)))
+            f.write(blob)
+
+        for start in range(0, len(arr), chunk_rows):
+            pending.append(pool.submit(encode, start))
+            if len(pending) > 2 * n_threads:
+                drain()
+        while pending:
+            drain()
+
+        index_offset = f.tell()
+        f.write(np.array(index, dtype=_INDEX_DTYPE).tobytes())
+        f.write(_FOOTER.pack(index_offset, MAGIC))
+    return len(index)
+
+
+class ChunkedArray:
+    """
+    Read-only, lazily decompressed view of a chunked store.
+
+    Indexing along axis 0 (int, slice or integer array, optionally followed
+    by indices for the remaining axes) decompresses only the touched chunks,
+    in parallel on a thread pool owned by the instance (`n_jobs` threads,
+    default min(8, CPUs + 4)). Slices and ints are resolved arithmetically,
+    so a read costs O(rows read), not O(rows stored). Decompressed chunks
+    are not cached.
+    """
+
+    def __init__(self, path, n_jobs=None):
+        self.path = os.fspath(path)
+        self.n_jobs = _n_threads(n_jobs)
+        self._pool = None
+        self._file = open(self.path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_layout()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_layout(self):
+        buf = self._buf
+        if len(buf) < len(MAGIC) + 4 + _FOOTER.size or buf[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"❌ {self.path} is not a chunked array store.")
+        index_offset, tail = _FOOTER.unpack_from(buf, len(buf) - _FOOTER.size)
+        if tail != MAGIC:
+            raise ValueError(f"❌ {self.path} is truncated (missing footer).")
+        (header_len,) = struct.unpack_from("<I", buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(buf[start:start + header_len]))
+        if header["version"] > VERSION:
+            raise ValueError(f"❌ Store version {header['version']} is newer than "
+                             f"supported version {VERSION}.")
+        self.shape = tuple(header["shape"])
+        self.dtype = np.lib.format.descr_to_dtype(header["dtype"])
+        self.chunk_rows = header["chunk_rows"]
+        self.codec = header["codec"]
+        n_chunks = -(-self.shape[0] // self.chunk_rows)
+        self._index = np.frombuffer(buf, dtype=_INDEX_DTYPE, count=n_chunks,
+                                    offset=index_offset).copy()
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def n_chunks(self):
+        return len(self._index)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def read_chunk(self, i):
+        """Decompresses chunk `i` into a new array."""
+        offset, nbytes = self._index[i]
+        raw = _decompress(self._buf[offset:offset + nbytes], self.codec)
+        rows = min(self.chunk_rows, self.shape[0] - i * self.chunk_rows)
+        return np.frombuffer(raw, dtype=self.dtype).reshape((rows,) + self.shape[1:])
+
+    def _range_tasks(self, rows):
+        """(chunk, output slice, local slice) for each chunk a positive-step range touches."""
+        cr, step = self.chunk_rows, rows.step
+        tasks = []
+        for c in range(rows[0] // cr, rows[-1] // cr + 1):
+            lo, hi = c * cr, min((c + 1) * cr, self.shape[0])
+            first = rows.start + -(-(max(rows.start, lo) - rows.start) // step) * step
+            last = min(rows.stop, hi)
+            if first < last:
+                pos = (first - rows.start) // step
+                count = len(range(first, last, step))
+                tasks.append((c, slice(pos, pos + count), slice(first - lo, last - lo, step)))
+        return tasks
+
+    def _index_tasks(self, rows):
+        """(chunk, output positions, local rows) for an explicit row index array."""
+        chunk_ids = rows // self.chunk_rows
+        tasks = []
+        for c in np.unique(chunk_ids):
+            positions = np.flatnonzero(chunk_ids == c)
+            tasks.append((int(c), positions, rows[positions] - c * self.chunk_rows))
+        return tasks
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        if not key or key[0] is Ellipsis:
+            return self[:][key]
+        row_key, rest = key[0], key[1:]
+        n = self.shape[0]
+        scalar = isinstance(row_key, (int, np.integer))
+        reverse = False
+        if scalar:
+            if not -n <= row_key < n:
+                raise IndexError(f"index {row_key} is out of bounds for axis 0 with size {n}")
+            row_key = int(row_key) % n
+            rows = range(row_key, row_key + 1)
+        elif isinstance(row_key, slice):
+            rows = range(*row_key.indices(n))
+            if rows.step < 0:
+                rows, reverse = rows[::-1], True
+        else:
+            rows = np.asarray(row_key)
+            if rows.dtype == bool:
+                if rows.shape != (n,):
+                    raise IndexError(f"boolean index has shape {rows.shape}, expected ({n},)")
+                rows = np.flatnonzero(rows)
+            elif rows.ndim != 1 or not np.issubdtype(rows.dtype, np.integer):
+                raise IndexError("❌ Row index must be an int, slice, or 1D integer/boolean array.")
+            elif len(rows) and (rows.min() < -n or rows.max() >= n):
+                raise IndexError(f"row index out of bounds for axis 0 with size {n}")
+            rows = np.where(rows < 0, rows + n, rows)
+
+        out = np.empty((len(rows),) + self.shape[1:], dtype=self.dtype)
+        if len(rows):
+            tasks = self._range_tasks(rows) if isinstance(rows, range) else self._index_tasks(rows)
+
+            def fill(task):
+                c, positions, local = task
+                out[positions] = self.read_chunk(c)[local]
+
+            if self.n_jobs > 1 and len(tasks) > 1:
+                list(self._executor().map(fill, tasks))
+            else:
+                for task in tasks:
+                    fill(task)
+
+        if reverse:
+            out = out[::-1]
+        if scalar:
+            return out[0][rest]
+        return out[(slice(None),) + rest]
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.n_jobs)
+        return self._pool
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self[:]
+        return arr if dtype is None else arr.astype(dtype, copy=False)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        buf = getattr(self, "_buf", None)
+        if buf is not None:
+            buf.close()
+            self._buf = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return (f"ChunkedArray(path={self.path!r}, shape={self.shape}, dtype={self.dtype}, "
+                f"chunk_rows={self.chunk_rows}, codec={self.codec!r})")
+
+
+def open_chunked(path, n_jobs=None):
+    """Opens a store written by `save_chunked` as a lazily read `ChunkedArray`."""
+    return ChunkedArray(path, n_jobs=n_jobs)
+
+
+def load_chunked(path, n_jobs=None):
+    """Reads a whole chunked store into memory."""
+    with ChunkedArray(path, n_jobs=n_jobs) as store:
+        return store[:]
@@ -1,5 +1,19 @@
+import contextlib
+import hashlib
+import json
 import numpy as np
 import os
+import struct
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+try:
+    from .chunked_store import open_chunked
+except ImportError:  # imported as a top-level module (notebooks add scripts/ to sys.path)
+    from chunked_store import open_chunked
 
 def save_npy(path, arr):
     np.save(path, arr)
@@ -26,10 +40,722 @@ def write_csv_with_missing_values(path):
 def load_genfromtxt(path, delimiter=","):
     return np.genfromtxt(path, delimiter=delimiter)
 
-def create_memmap(path, shape=(3, 3), dtype='float32'):
-    mmap = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
-    mmap[:] = np.random.rand(*shape)
+def _parse_csv_block(lines, dtype, delimiter, missing, filling_value):
+    """
+    Parses a list of text lines into a 2D array.
+    Complete blocks go through NumPy's C parser; blocks with empty fields fall
+    back to one vectorised string cast, with empty fields becoming NaN
+    (missing="nan") or masked entries (missing="mask").
+    """
+    lines = [line for line in lines if line.strip()]
+    n_rows = len(lines)
+    if n_rows == 0:
+        return np.empty((0, 0), dtype=dtype)
+    try:
+        values = np.loadtxt(lines, dtype=dtype, delimiter=delimiter, ndmin=2)
+    except ValueError:
+        pass
+    else:
+        if missing == "mask":
+            return np.ma.MaskedArray(values, mask=np.zeros(values.shape, dtype=bool))
+        return values
+
+    n_fields = np.char.count(np.array(lines), delimiter) + 1
+    if np.any(n_fields != n_fields[0]):
+        bad = int(np.flatnonzero(n_fields != n_fields[0])[0])
+        raise ValueError(f"❌ Rows have inconsistent numbers of fields: block row {bad} has "
+                         f"{n_fields[bad]}, expected {n_fields[0]}.")
+    text = "".join(lines).replace("\r\n", "\n").rstrip("\n")
+    fields = np.char.strip(np.array(text.replace("\n", delimiter).split(delimiter)))
+    fields = fields.reshape(n_rows, n_fields[0])
+
+    # np.where widens the fixed-width string dtype, so "nan" is never truncated
+    empty = fields == ""
+    if missing == "mask":
+        values = np.where(empty, "0", fields).astype(dtype)
+        values[empty] = filling_value
+        return np.ma.MaskedArray(values, mask=empty)
+    return np.where(empty, "nan", fields).astype(dtype)
+
+def iter_csv_chunks(path, chunk_rows=65536, dtype=np.float64, delimiter=",", skip_header=0,
+                    missing="nan", filling_value=0, n_jobs=None):
+    """
+    Reads a delimited text file in blocks of `chunk_rows` rows.
+
+    Each block is converted by NumPy's C parser (or, when it has empty
+    fields, by a single vectorised string cast) instead of a Python loop per
+    value, so memory stays bounded by one block. With `n_jobs` > 1, blocks
+    are parsed on a thread pool while the next ones are read, and are still
+    yielded in file order. Blank lines are dropped (blocks left empty are
+    not yielded), and every block must have as many columns as the first.
+
+    Parameters:
+    - path (str or os.PathLike): Text/CSV file
+    - chunk_rows (int): Rows per yielded block
+    - dtype (np.dtype): Output dtype
+    - delimiter (str): Field separator
+    - skip_header (int): Leading lines to skip
+    - missing (str): "nan" fills empty fields with NaN (float dtypes only);
+      "mask" yields ``np.ma.MaskedArray`` blocks with empty fields masked
+    - filling_value: Value stored under masked entries
+    - n_jobs (int, optional): Parser threads
+
+    Yields:
+    - np.ndarray or np.ma.MaskedArray: Blocks of shape (rows, n_columns)
+
+    Raises:
+    - ValueError: If the number of columns changes between rows
+    """
+    if missing not in ("nan", "mask"):
+        raise ValueError(f"❌ Unknown missing mode '{missing}'. Use 'nan' or 'mask'.")
+    if missing == "nan" and not np.issubdtype(dtype, np.floating):
+        raise ValueError("❌ missing='nan' needs a float dtype; use missing='mask'.")
+
+    n_jobs = 1 if n_jobs is None else max(1, n_jobs if n_jobs > 0 else os.cpu_count() or 1)
+    with open(path, "r") as f:
+        for _ in islice(f, skip_header):
+            pass
+        blocks = iter(lambda: list(islice(f, chunk_rows)), [])
+        args = (dtype, delimiter, missing, filling_value)
+
+        def parsed():
+            if n_jobs == 1:
+                for lines in blocks:
+                    yield _parse_csv_block(lines, *args)
+                return
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                pending = deque()
+                for lines in blocks:
+                    pending.append(pool.submit(_parse_csv_block, lines, *args))
+                    if len(pending) > 2 * n_jobs:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+
+        # _parse_csv_block only checks within a block; widths must also agree across blocks
+        n_columns, n_rows = None, 0
+        for block in parsed():
+            if len(block) == 0:
+                continue
+            if n_columns is None:
+                n_columns = block.shape[1]
+            elif block.shape[1] != n_columns:
+                raise ValueError(f"❌ Rows have inconsistent numbers of fields: the block starting "
+                                 f"at data row {n_rows} has {block.shape[1]}, expected {n_columns}.")
+            n_rows += len(block)
+            yield block
+
+_NPY_MAGIC = b"\x93NUMPY"
+
+def _npy_header(dtype, shape, total_len=None):
+    """
+    Builds a .npy (C order) header, padded with spaces to `total_len` bytes
+    (default: the next multiple of 64, as NumPy does).
+    """
+    d = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False,
+         "shape": tuple(shape)}
+    body = "{" + "".join(f"'{key}': {value!r}, " for key, value in sorted(d.items())) + "}"
+
+    def aligned_size(prefix_len):
+        return -(-(prefix_len + len(body) + 1) // 64) * 64
+
+    size = aligned_size(10) if total_len is None else total_len
+    version, fmt = ((1, 0), "<H") if size - 10 < 1 << 16 else ((2, 0), "<I")
+    if total_len is None and version == (2, 0):
+        size = aligned_size(12)
+    header_len = size - len(_NPY_MAGIC) - 2 - struct.calcsize(fmt)
+    if header_len < len(body) + 1:
+        raise ValueError("❌ Reserved .npy header is too small for this shape.")
+    padded = body + " " * (header_len - len(body) - 1) + "\n"
+    return _NPY_MAGIC + bytes(version) + struct.pack(fmt, header_len) + padded.encode("latin1")
+
+class NpyAppendWriter:
+    """
+    Streams rows into a .npy file without holding the array in memory.
+
+    The header is written on the first `append` with room reserved for a
+    20-digit row count; each call appends raw rows at the end of the file,
+    and `close` rewrites only the shape in the header. The result is an
+    ordinary C-ordered .npy readable by `np.load` / `load_npy` and
+    memory-mappable with ``mmap_mode``.
+
+    Parameters:
+    - path (str or os.PathLike): Output .npy file
+    - dtype (np.dtype, optional): Row dtype (default: dtype of the first append)
+    - row_shape (tuple, optional): Shape of one row (default: from the first append)
+
+    Example:
+    >>> with NpyAppendWriter("out.npy", dtype=np.float32, row_shape=(8,)) as w:
+    ...     for batch in batches:
+    ...         w.append(batch)
+    """
+
+    _MAX_ROWS = 10 ** 20 - 1
+
+    def __init__(self, path, dtype=None, row_shape=None):
+        self.path = os.fspath(path)
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        if self.dtype is not None and self.dtype.hasobject:
+            raise ValueError("❌ Object arrays cannot be streamed to .npy.")
+        self.row_shape = None if row_shape is None else tuple(row_shape)
+        self.n_rows = 0
+        self._header_len = None
+        self._file = open(self.path, "wb")
+
+    @property
+    def shape(self):
+        return (self.n_rows,) + (self.row_shape or ())
+
+    def _start(self):
+        self.dtype = np.dtype(np.float64) if self.dtype is None else self.dtype
+        self.row_shape = () if self.row_shape is None else self.row_shape
+        header = _npy_header(self.dtype, (self._MAX_ROWS,) + self.row_shape)
+        self._header_len = len(header)
+        self._file.write(header)
+
+    def append(self, rows):
+        """
+        Appends a block of rows of shape (n, *row_shape), or a single row of
+        shape `row_shape`.
+        """
+        if self._file is None:
+            raise ValueError("❌ Writer is closed.")
+        rows = np.asarray(rows, dtype=self.dtype)
+        if self.row_shape is None:
+            self.row_shape = rows.shape[1:]
+        if self._header_len is None:
+            self.dtype = rows.dtype if self.dtype is None else self.dtype
+            self._start()
+        if rows.shape == self.row_shape:
+            rows = rows[np.newaxis]
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(f"❌ Rows of shape {rows.shape[1:]} do not match row shape "
+                             f"{self.row_shape}.")
+        if self.n_rows + len(rows) > self._MAX_ROWS:
+            raise ValueError("❌ Row count exceeds the reserved header space.")
+        # A uint8 view, since buffer casts reject datetime64/timedelta64
+        self._file.write(np.ascontiguousarray(rows).reshape(-1).view(np.uint8))
+        self.n_rows += len(rows)
+
+    def close(self):
+        """Rewrites the header with the final shape and closes the file."""
+        if self._file is None:
+            return
+        try:
+            if self._header_len is None:
+                self._start()
+            self._file.seek(0)
+            self._file.write(_npy_header(self.dtype, self.shape, total_len=self._header_len))
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+CSV_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "numpymasterpro", "csv")
+
+def _csv_cache_entries(cache_dir):
+    """Groups cache files by entry name; returns {entry: (files, size, last_used)}."""
+    entries = {}
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npy") or name.startswith("."):
+            continue
+        entry = name.split(".", 1)[0]
+        full = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(full)
+        except FileNotFoundError:
+            continue
+        files, size, last_used = entries.get(entry, ([], 0, 0))
+        entries[entry] = (files + [full], size + stat.st_size, max(last_used, stat.st_mtime_ns))
+    return entries
+
+def _remove_files(files):
+    for full in files:
+        try:
+            os.remove(full)
+        except FileNotFoundError:
+            pass
+
+def load_csv_cached(path, delimiter=",", dtype=np.float64, skip_header=0, missing="nan",
+                    filling_value=0, cache_dir=None, max_cache_bytes=1 << 30, mmap_mode="r"):
+    """
+    Parses a delimited text file once and serves later loads from a binary cache.
+
+    The cache key combines the file's absolute path, size and mtime with the
+    parse options, so edited files or different options miss the cache.
+    A miss streams the file through `iter_csv_chunks` into a cached .npy
+    (plus a boolean .npy mask with missing="mask"), written atomically.
+    A hit memory-maps the cached file instead of parsing text.
+    Older entries for the same path are purged on a miss, and the least
+    recently used entries are evicted while the cache exceeds `max_cache_bytes`.
+
+    Parameters:
+    - path (str or os.PathLike): Text/CSV file
+    - delimiter, dtype, skip_header, missing, filling_value: As for `iter_csv_chunks`
+    - cache_dir (str, optional): Cache directory (default: `CSV_CACHE_DIR`)
+    - max_cache_bytes (int): Size bound for the whole cache directory
+    - mmap_mode (str or None): How cached arrays are opened by `np.load`
+
+    Returns:
+    - np.ndarray / np.memmap, or np.ma.MaskedArray with missing="mask"
+    """
+    cache_dir = CSV_CACHE_DIR if cache_dir is None else os.fspath(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    source = os.path.abspath(path)
+    stat = os.stat(source)
+    options = {"delimiter": delimiter, "dtype": np.dtype(dtype).str, "skip_header": skip_header,
+               "missing": missing, "filling_value": repr(filling_value)}
+    path_id = hashlib.sha256(source.encode()).hexdigest()[:16]
+    key = hashlib.sha256(json.dumps([source, stat.st_size, stat.st_mtime_ns, options],
+                                    sort_keys=True).encode()).hexdigest()[:32]
+    entry = f"{path_id}-{key}"
+    data_path = os.path.join(cache_dir, entry + ".npy")
+    mask_path = os.path.join(cache_dir, entry + ".mask.npy")
+
+    if not (os.path.exists(data_path) and (missing != "mask" or os.path.exists(mask_path))):
+        tmp_paths = []
+        try:
+            for _ in range(2 if missing == "mask" else 1):
+                fd, tmp = tempfile.mkstemp(suffix=".tmp", prefix=".", dir=cache_dir)
+                os.close(fd)
+                tmp_paths.append(tmp)
+            with NpyAppendWriter(tmp_paths[0], dtype=dtype) as writer, \
+                    (NpyAppendWriter(tmp_paths[1], dtype=bool) if missing == "mask"
+                     else contextlib.nullcontext()) as mask_writer:
+                for block in iter_csv_chunks(source, dtype=dtype, delimiter=delimiter,
+                                             skip_header=skip_header, missing=missing,
+                                             filling_value=filling_value):
+                    if mask_writer is None:
+                        writer.append(block)
+                    else:
+                        writer.append(block.data)
+                        mask_writer.append(np.ma.getmaskarray(block))
+            # The mask goes in first: an entry only counts as present once its data file exists
+            if missing == "mask":
+                os.replace(tmp_paths[1], mask_path)
+            os.replace(tmp_paths[0], data_path)
+        finally:
+            _remove_files(p for p in tmp_paths if os.path.exists(p))
+
+        entries = _csv_cache_entries(cache_dir)
+        for name, (files, _, _) in list(entries.items()):
+            if name.startswith(path_id + "-") and name != entry:
+                _remove_files(files)
+                del entries[name]
+        total = sum(size for _, size, _ in entries.values())
+        for name, (files, size, _) in sorted(entries.items(), key=lambda item: item[1][2]):
+            if total <= max_cache_bytes:
+                break
+            if name != entry:
+                _remove_files(files)
+                total -= size
+    else:
+        os.utime(data_path)
+
+    data = np.load(data_path, mmap_mode=mmap_mode)
+    if missing == "mask":
+        return np.ma.MaskedArray(data, mask=np.load(mask_path, mmap_mode=mmap_mode))
+    return data
+
+def clear_csv_cache(cache_dir=None):
+    """Removes every entry from a `load_csv_cached` cache directory."""
+    cache_dir = CSV_CACHE_DIR if cache_dir is None else os.fspath(cache_dir)
+    if os.path.isdir(cache_dir):
+        for files, _, _ in _csv_cache_entries(cache_dir).values():
+            _remove_files(files)
+
+MEMMAP_VERSION = 1
+
+def _memmap_meta_path(path):
+    return os.fspath(path) + ".json"
+
+def _write_memmap_meta(path, shape, dtype, order):
+    meta = {"version": MEMMAP_VERSION, "shape": [int(n) for n in shape],
+            "dtype": np.dtype(dtype).str, "order": order}
+    meta_path = _memmap_meta_path(path)
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+def read_memmap_meta(path):
+    """
+    Reads the JSON sidecar written next to a memmap by `create_memmap`.
+
+    Returns:
+    - dict: {"version", "shape" (tuple), "dtype" (np.dtype), "order"},
+      or None if the file has no sidecar
+    """
+    meta_path = _memmap_meta_path(path)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    if meta.get("version", 0) > MEMMAP_VERSION:
+        raise ValueError(f"❌ Memmap header version {meta['version']} is newer than "
+                         f"supported version {MEMMAP_VERSION}.")
+    return {"version": meta["version"], "shape": tuple(meta["shape"]),
+            "dtype": np.dtype(meta["dtype"]), "order": meta.get("order", "C")}
+
+def _open_memmap(path, shape, dtype, order, mode):
+    expected = int(np.prod(shape)) * dtype.itemsize
+    actual = os.path.getsize(path)
+    if actual != expected:
+        raise ValueError(f"❌ {os.fspath(path)} holds {actual} bytes, but shape {tuple(shape)} "
+                         f"of {dtype} needs {expected}.")
+    if expected == 0:
+        # mmap cannot map an empty file; an empty array is equivalent
+        return np.empty(shape, dtype=dtype, order=order)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=tuple(shape), order=order)
+
+def create_memmap(path, shape=(3, 3), dtype='float32', order="C", block_rows=65536):
+    """
+    Creates a memmap filled with uniform random values and writes a JSON
+    sidecar (``path + ".json"``) recording its shape, dtype, order and
+    format version, so `load_memmap` can reopen it without being told.
+
+    Values are generated and written `block_rows` rows at a time, so peak
+    memory is one block rather than the whole array. Blocks draw from the
+    global generator in row order, giving the same values as a single
+    ``np.random.rand(*shape)`` call.
+    """
+    dtype = np.dtype(dtype)
+    if order not in ("C", "F"):
+        raise ValueError(f"❌ Unknown order '{order}'. Use 'C' or 'F'.")
+    if int(np.prod(shape)) == 0:
+        open(path, "wb").close()
+        mmap = np.empty(shape, dtype=dtype, order=order)
+    else:
+        mmap = np.memmap(path, dtype=dtype, mode='w+', shape=shape, order=order)
+        if mmap.ndim == 0:
+            mmap[()] = np.random.rand()
+        else:
+            for start in range(0, shape[0], block_rows):
+                stop = min(start + block_rows, shape[0])
+                mmap[start:stop] = np.random.rand(stop - start, *shape[1:])
+        mmap.flush()
+    _write_memmap_meta(path, shape, dtype, order)
     return mmap
 
-def load_memmap(path, shape=(3, 3), dtype='float32'):
-    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
\ No newline at end of file
+def load_memmap(path, shape=None, dtype=None, mode='r'):
+    """
+    Opens a memmap lazily and zero-copy.
+
+    Shape, dtype and order come from the sidecar written by `create_memmap`.
+    For raw files without a sidecar, `shape` and `dtype` must be given.
+    Explicit values that contradict the sidecar, or a file size that does not
+    match the shape, raise instead of silently reading garbage.
+    """
+    meta = read_memmap_meta(path)
+    if meta is None:
+        if shape is None or dtype is None:
+            raise ValueError(f"❌ {os.fspath(path)} has no memmap header; pass shape and dtype.")
+        return _open_memmap(path, tuple(shape), np.dtype(dtype), "C", mode)
+    if shape is not None and tuple(shape) != meta["shape"]:
+        raise ValueError(f"❌ Shape {tuple(shape)} does not match stored shape {meta['shape']}.")
+    if dtype is not None and np.dtype(dtype) != meta["dtype"]:
+        raise ValueError(f"❌ Dtype {np.dtype(dtype)} does not match stored dtype {meta['dtype']}.")
+    return _open_memmap(path, meta["shape"], meta["dtype"], meta["order"], mode)
+
+def append_memmap_rows(path, rows):
+    """
+    Grows a C-ordered memmap along axis 0 by appending `rows` to the end of
+    the file; existing data is not rewritten. The sidecar is updated
+    atomically after the data is written.
+
+    Returns:
+    - np.memmap: The grown array, opened read/write
+    """
+    meta = read_memmap_meta(path)
+    if meta is None:
+        raise ValueError(f"❌ {os.fspath(path)} has no memmap header; create it with create_memmap.")
+    if meta["order"] != "C" and len(meta["shape"]) > 1:
+        raise ValueError("❌ Only C-ordered memmaps can grow along axis 0.")
+    shape, dtype = meta["shape"], meta["dtype"]
+    rows = np.asarray(rows, dtype=dtype)
+    if rows.ndim == len(shape) - 1:
+        rows = rows[np.newaxis]
+    if rows.shape[1:] != shape[1:]:
+        raise ValueError(f"❌ Rows of shape {rows.shape[1:]} cannot extend memmap rows of "
+                         f"shape {shape[1:]}.")
+    with open(path, "ab") as f:
+        np.ascontiguousarray(rows).tofile(f)
+    new_shape = (shape[0] + rows.shape[0],) + shape[1:]
+    _write_memmap_meta(path, new_shape, dtype, meta["order"])
+    return _open_memmap(path, new_shape, dtype, meta["order"], "r+")
+
+def map_blocks(memmap_in, fn, memmap_out=None, block_rows=65536, prefetch=False):
+    """
+    Streams `memmap_in` through `fn` in blocks of `block_rows` rows, so any
+    row-wise function (e.g. from math_utils or stats_utils) runs with memory
+    bounded by one block.
+
+    Parameters:
+    - memmap_in (np.ndarray or np.memmap): Input, split along axis 0
+    - fn (callable): Applied to each in-memory block
+    - memmap_out (np.ndarray or np.memmap, optional): Receives fn's output
+      at the same rows; fn must then return one row per input row
+    - block_rows (int): Rows per block
+    - prefetch (bool): Read the next block on a background thread while fn
+      runs on the current one
+
+    Returns:
+    - memmap_out (flushed), or a list of fn's per-block results if
+      `memmap_out` is None
+    """
+    if block_rows < 1:
+        raise ValueError("❌ block_rows must be a positive integer.")
+    n_rows = len(memmap_in)
+    if memmap_out is not None and len(memmap_out) != n_rows:
+        raise ValueError(f"❌ memmap_out has {len(memmap_out)} rows; expected {n_rows}.")
+    starts = range(0, n_rows, block_rows)
+
+    def read(start):
+        return np.array(memmap_in[start:start + block_rows])
+
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(read, 0) if prefetch and n_rows else None
+        for start in starts:
+            if pending is not None:
+                block = pending.result()
+                nxt = start + block_rows
+                pending = pool.submit(read, nxt) if nxt < n_rows else None
+            else:
+                block = read(start)
+            out = fn(block)
+            if memmap_out is None:
+                results.append(out)
+                continue
+            out = np.asarray(out)
+            if out.ndim == 0 or len(out) != len(block):
+                raise ValueError("❌ fn must return one row per input row when memmap_out is given.")
+            memmap_out[start:start + len(block)] = out
+
+    if memmap_out is None:
+        return results
+    if isinstance(memmap_out, np.memmap):
+        memmap_out.flush()
+    return memmap_out
+
+
+_ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_ZIP_PAD_EXTRA_ID = 0xD935
+
+def _read_npy_header(f):
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+class LazyNpzFile:
+    """
+    Lazy, zero-copy view of an .npz archive.
+
+    The zip central directory is indexed once on open. Uncompressed (stored)
+    members are returned as read-only ``np.memmap`` views at their offset in
+    the archive; compressed members are decompressed as a stream straight
+    into a new array. Memmapped members stay valid after `close`.
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path = os.fspath(path)
+        self.mmap_mode = mmap_mode
+        self._zip = zipfile.ZipFile(self.path, "r")
+        self._infos = {info.filename: info for info in self._zip.infolist()}
+        self._views = {}
+
+    def _info(self, name):
+        info = self._infos.get(name) or self._infos.get(name + ".npy")
+        if info is None:
+            raise KeyError(f"{name} is not a member of {self.path}")
+        return info
+
+    def _member_layout(self, info):
+        with open(self.path, "rb") as f:
+            f.seek(info.header_offset)
+            fields = _ZIP_LOCAL_HEADER.unpack(f.read(_ZIP_LOCAL_HEADER.size))
+            if fields[0] != b"PK\x03\x04":
+                raise ValueError(f"❌ Corrupt local header for {info.filename} in {self.path}.")
+            name_len, extra_len = fields[-2:]
+            data_offset = info.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
+            f.seek(data_offset)
+            shape, fortran_order, dtype = _read_npy_header(f)
+            return shape, fortran_order, dtype, f.tell()
+
+    def keys(self):
+        return [name[:-4] if name.endswith(".npy") else name for name in self._infos]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._infos)
+
+    def __contains__(self, name):
+        return name in self._infos or name + ".npy" in self._infos
+
+    def info(self, name):
+        """
+        Returns the layout of a member: shape, dtype, whether it is stored
+        uncompressed, the byte offset of its array data, and whether that
+        offset is 64-byte aligned (stored members only).
+        """
+        info = self._info(name)
+        stored = info.compress_type == zipfile.ZIP_STORED
+        if stored:
+            shape, fortran_order, dtype, offset = self._member_layout(info)
+        else:
+            with self._zip.open(info) as f:
+                shape, fortran_order, dtype = _read_npy_header(f)
+            offset = None
+        return {"shape": shape, "dtype": dtype, "fortran_order": fortran_order,
+                "stored": stored, "offset": offset,
+                "aligned": stored and offset % 64 == 0}
+
+    def __getitem__(self, name):
+        info = self._info(name)
+        if info.filename in self._views:
+            return self._views[info.filename]
+        if info.compress_type != zipfile.ZIP_STORED:
+            with self._zip.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+        shape, fortran_order, dtype, offset = self._member_layout(info)
+        if dtype.hasobject:
+            raise ValueError(f"❌ {info.filename} holds Python objects and cannot be memory-mapped.")
+        if int(np.prod(shape)) == 0:
+            view = np.empty(shape, dtype=dtype, order="F" if fortran_order else "C")
+        else:
+            view = np.memmap(self.path, dtype=dtype, mode=self.mmap_mode, offset=offset,
+                             shape=shape, order="F" if fortran_order else "C")
+        self._views[info.filename] = view
+        return view
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_npz_lazy(path, mmap_mode="r"):
+    """
+    Opens an .npz archive without reading its members; see `LazyNpzFile`.
+    """
+    return LazyNpzFile(path, mmap_mode=mmap_mode)
+
+def _zip_pad_extra(data_start, align):
+    pad = -data_start % align
+    if pad == 0:
+        return b""
+    # The extra field's own 4-byte header must fit; small alignments may need several steps
+    while pad < 4:
+        pad += align
+    return struct.pack("<HH", _ZIP_PAD_EXTRA_ID, pad - 4) + b"\0" * (pad - 4)
+
+def save_npz_aligned(path, align=64, **arrays):
+    """
+    Writes an uncompressed .npz whose array data starts on `align`-byte
+    boundaries, so `load_npz_lazy` can memory-map every member aligned.
+
+    Each local zip header is padded with an extra field (id 0xD935) so the
+    .npy member starts aligned; the .npy header itself is padded to a
+    multiple of 64 bytes by NumPy. The result is an ordinary .npz readable
+    by `np.load` / `load_npz`.
+    """
+    if align < 1 or 64 % align:
+        raise ValueError("❌ align must divide 64.")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name, arr in arrays.items():
+            arr = np.asanyarray(arr)
+            zinfo = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            zinfo.compress_type = zipfile.ZIP_STORED
+            force_zip64 = arr.nbytes * 1.05 + 65536 > zipfile.ZIP64_LIMIT
+            name_len = len(zinfo.filename.encode("utf-8"))
+            data_start = zf.fp.tell() + _ZIP_LOCAL_HEADER.size + name_len + (20 if force_zip64 else 0)
+            zinfo.extra = _zip_pad_extra(data_start, align)
+            with zf.open(zinfo, "w", force_zip64=force_zip64) as f:
+                np.lib.format.write_array(f, arr, allow_pickle=False)
+
+def _open_batch_source(source):
+    if not isinstance(source, (str, os.PathLike)):
+        return source, False
+    path = os.fspath(source)
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r"), False
+    if read_memmap_meta(path) is not None:
+        return load_memmap(path), False
+    return open_chunked(path), True
+
+def iter_batches(source, batch_size=1024, prefetch=2, shuffle_blocks=False, block_rows=None,
+                 dtype=None, reuse_buffers=True, drop_last=False, n_jobs=1, random_state=None):
+    """
+    Yields row batches from an array-like source while the next `prefetch`
+    batches are read on a background thread pool, so I/O overlaps compute.
+
+    Parameters:
+    - source: An array, np.memmap or `ChunkedArray`, or a path to a .npy
+      file, a memmap with a sidecar (see `create_memmap`) or a chunked store
+    - batch_size (int): Rows per batch
+    - prefetch (int): Batches read ahead of the consumer
+    - shuffle_blocks (bool): Visit blocks of `block_rows` rows in random
+      order; rows inside a block stay contiguous so reads stay sequential
+    - block_rows (int, optional): Shuffle granularity (default: batch_size)
+    - dtype (np.dtype, optional): Cast batches to this dtype while copying
+    - reuse_buffers (bool): Copy into a ring of `prefetch + 1` preallocated
+      buffers instead of allocating per batch. A yielded batch is then only
+      valid until the following batch is requested; copy it to keep it.
+    - drop_last (bool): Skip a final batch shorter than `batch_size`
+    - n_jobs (int): Reader threads
+    - random_state (int or np.random.Generator, optional): Shuffle seed
+
+    Yields:
+    - np.ndarray: Batches of shape (<= batch_size, *row_shape)
+    """
+    if batch_size < 1 or prefetch < 1:
+        raise ValueError("❌ batch_size and prefetch must be positive integers.")
+    data, owned = _open_batch_source(source)
+    try:
+        n_rows = len(data)
+        block_rows = batch_size if block_rows is None else block_rows
+        if block_rows < 1:
+            raise ValueError("❌ block_rows must be a positive integer.")
+        blocks = np.arange(0, n_rows, block_rows)
+        if shuffle_blocks:
+            np.random.default_rng(random_state).shuffle(blocks)
+        ranges = [(start, min(start + batch_size, block + block_rows, n_rows))
+                  for block in blocks
+                  for start in range(block, min(block + block_rows, n_rows), batch_size)]
+        if drop_last:
+            ranges = [(start, stop) for start, stop in ranges if stop - start == batch_size]
+
+        out_dtype = np.dtype(data.dtype if dtype is None else dtype)
+        batch_shape = (batch_size,) + tuple(data.shape[1:])
+        ring = [np.empty(batch_shape, dtype=out_dtype) for _ in range(prefetch + 1)] \
+            if reuse_buffers else None
+
+        def read(i):
+            start, stop = ranges[i]
+            if ring is None:
+                return np.array(data[start:stop], dtype=out_dtype)
+            buf = ring[i % len(ring)][:stop - start]
+            np.copyto(buf, data[start:stop], casting="unsafe")
+            return buf
+
+        with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+            pending = deque(pool.submit(read, i) for i in range(min(prefetch, len(ranges))))
+            for i in range(len(ranges)):
+                batch = pending.popleft().result()
+                if i + prefetch < len(ranges):
+                    pending.append(pool.submit(read, i + prefetch))
+                yield batch
+    finally:
+        if owned:
+            data.close()
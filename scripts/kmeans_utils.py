@@ -1,28 +1,271 @@
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 
-def generate_data():
+try:
+    from .io_utils import load_npz, save_npz
+except ImportError:  # imported as a top-level module (notebooks add scripts/ to sys.path)
+    from io_utils import load_npz, save_npz
+
+try:
+    from scipy import sparse
+    from scipy.spatial import cKDTree
+except ImportError:  # optional extra (requirements_dev.txt); NumPy fallbacks below
+    cKDTree = sparse = None
+
+def generate_data(dtype=np.float64):
     """
     Generates synthetic 2D data with 3 clusters of 50 points each.
+
+    Always returns the same points (seed 42) without touching the global
+    ``np.random`` state. Use `make_blobs` for larger or configurable data.
+    """
+    rng = np.random.RandomState(42)
+    cluster_1 = rng.randn(50, 2) + [2, 2]
+    cluster_2 = rng.randn(50, 2) + [7, 7]
+    cluster_3 = rng.randn(50, 2) + [2, 7]
+    return np.vstack((cluster_1, cluster_2, cluster_3)).astype(dtype, copy=False)
+
+def _fill_blobs_chunk(seed, out, labels, centers, cluster_std):
+    rng = np.random.default_rng(seed)
+    labels[...] = rng.integers(len(centers), size=len(labels))
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= cluster_std[labels, np.newaxis]
+    out += centers[labels]
+
+def make_blobs(n_samples=150, n_features=2, k=3, cluster_std=1.0, center_box=(-10.0, 10.0),
+               centers=None, dtype=np.float64, random_state=None, out=None,
+               labels_out=None, chunk_rows=2**20, n_jobs=None):
+    """
+    Generates isotropic Gaussian clusters of any size, chunk by chunk.
+
+    Every chunk draws from its own ``SeedSequence``-spawned generator, so
+    chunks can be filled concurrently and the result only depends on
+    `random_state` and `chunk_rows`, never on `n_jobs`. Points and labels are
+    written straight into `out` and `labels_out`, so memmap targets never
+    need the full dataset in RAM. The global ``np.random`` state is left
+    untouched.
+
+    Parameters:
+    - n_samples (int): Number of points
+    - n_features (int): Number of dimensions
+    - k (int): Number of clusters (ignored when `centers` is given)
+    - cluster_std (float or np.ndarray): Standard deviation, shared or per cluster
+    - center_box (tuple): Bounds of the uniformly drawn cluster centers
+    - centers (np.ndarray, optional): Explicit centers of shape (k, n_features)
+    - dtype (np.dtype): float32 or float64
+    - random_state (int, optional): Seed
+    - out (np.ndarray, str or os.PathLike, optional): Target array of shape
+      (n_samples, n_features), or a path where a .npy memmap is created
+    - labels_out (np.ndarray, str or os.PathLike, optional): Target array of
+      shape (n_samples,), or a path where an int32 .npy memmap is created;
+      labels are kept in memory when omitted
+    - chunk_rows (int): Rows generated per chunk
+    - n_jobs (int, optional): Threads filling chunks concurrently (-1 for all CPUs)
+
+    Returns:
+    - np.ndarray: Points of shape (n_samples, n_features) (the memmap when `out` is a path)
+    - np.ndarray: Cluster index of each point, shape (n_samples,) (the memmap
+      when `labels_out` is a path)
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"❌ dtype must be float32 or float64, got {dtype}.")
+    root = np.random.SeedSequence(random_state)
+    center_seed, chunk_seeds = root.spawn(1)[0], root.spawn(-(-n_samples // chunk_rows))
+
+    if centers is None:
+        centers = np.random.default_rng(center_seed).uniform(*center_box, size=(k, n_features))
+    centers = np.asarray(centers, dtype=dtype)
+    n_features = centers.shape[1]
+    cluster_std = np.broadcast_to(np.asarray(cluster_std, dtype=dtype), (len(centers),))
+
+    if out is None:
+        out = np.empty((n_samples, n_features), dtype=dtype)
+    elif isinstance(out, (str, os.PathLike)):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=dtype,
+                                        shape=(n_samples, n_features))
+    if labels_out is None:
+        labels = np.empty(n_samples, dtype=np.int32)
+    elif isinstance(labels_out, (str, os.PathLike)):
+        labels = np.lib.format.open_memmap(labels_out, mode="w+", dtype=np.int32,
+                                           shape=(n_samples,))
+    else:
+        labels = labels_out
+
+    jobs = [(seed, out[start:start + chunk_rows], labels[start:start + chunk_rows],
+             centers, cluster_std)
+            for seed, start in zip(chunk_seeds, range(0, n_samples, chunk_rows))]
+    n_jobs = _effective_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for job in jobs:
+            _fill_blobs_chunk(*job)
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            list(pool.map(lambda job: _fill_blobs_chunk(*job), jobs))
+
+    for target in (out, labels):
+        if isinstance(target, np.memmap):
+            target.flush()
+    return out, labels
+
+def _check_random_state(random_state):
+    """
+    Turns `random_state` into a random generator.
+
+    None uses the global ``np.random`` state (so ``np.random.seed`` keeps
+    working), an int seeds a new ``np.random.Generator``, and existing
+    ``Generator``/``RandomState`` instances are passed through.
+    """
+    if random_state is None:
+        return np.random.mtrand._rand
+    if isinstance(random_state, (np.random.Generator, np.random.RandomState)):
+        return random_state
+    return np.random.default_rng(random_state)
+
+def _as_float_array(X, dtype=None):
+    """
+    Returns `X` as a floating point array, keeping float32/float64 inputs as-is
+    unless an explicit `dtype` is requested.
     """
-    np.random.seed(42)
-    cluster_1 = np.random.randn(50, 2) + [2, 2]
-    cluster_2 = np.random.randn(50, 2) + [7, 7]
-    cluster_3 = np.random.randn(50, 2) + [2, 7]
-    return np.vstack((cluster_1, cluster_2, cluster_3))
+    X = np.asarray(X)
+    if dtype is not None:
+        X = X.astype(dtype, copy=False)
+    elif X.dtype not in (np.float32, np.float64):
+        X = X.astype(np.float64)
+    return X
+
+def _squared_norms(X):
+    """
+    Returns the squared Euclidean norm of every row of `X`.
+    """
+    return np.einsum("ij,ij->i", X, X)
+
+def _block_rows(k, itemsize, max_memory_mb):
+    """
+    Number of rows whose (rows, k) distance block fits in `max_memory_mb`.
+    """
+    budget = int(max_memory_mb * 2**20)
+    return max(1, budget // max(1, k * itemsize))
+
+def _squared_distances_to(X, x_squared_norms, center):
+    """
+    Squared distances from every row of `X` to a single `center`.
+    """
+    dists = X @ center
+    dists *= -2
+    dists += x_squared_norms
+    dists += center @ center
+    np.maximum(dists, 0, out=dists)
+    return dists
+
+def _sample_index(rng, weights):
+    """
+    Draws one index with probability proportional to `weights`.
+    """
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    index = np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")
+    return min(index, len(weights) - 1)
+
+def _kmeans_plusplus(X, k, rng, x_squared_norms, sample_weight=None):
+    """
+    k-means++ seeding with incremental D² updates.
+
+    Only the distances to the newest centroid are computed at each step and
+    folded into the running minimum, so seeding costs O(n·k·d) overall.
+    """
+    n_samples = len(X)
+    weights = np.ones(n_samples) if sample_weight is None else sample_weight
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+
+    centroids[0] = X[_sample_index(rng, weights)]
+    closest = _squared_distances_to(X, x_squared_norms, centroids[0])
+    for i in range(1, k):
+        potential = closest * weights
+        if potential.sum() <= 0:
+            # Every point already sits on a centroid (duplicated data)
+            index = _sample_index(rng, weights)
+        else:
+            index = _sample_index(rng, potential)
+        centroids[i] = X[index]
+        np.minimum(closest, _squared_distances_to(X, x_squared_norms, centroids[i]),
+                   out=closest)
+    return centroids
+
+def _kmeans_parallel_seeding(X, k, rng, x_squared_norms, n_rounds=5,
+                             oversampling_factor=2.0, sample_weight=None):
+    """
+    k-means|| seeding (Bahmani et al.).
+
+    Each round samples about `oversampling_factor * k` points with probability
+    proportional to their D² cost, in one vectorised draw. The candidates are
+    weighted by the number of points closest to them and reduced to `k`
+    centroids with weighted k-means++.
+    """
+    n_samples = len(X)
+    weights = np.ones(n_samples) if sample_weight is None else sample_weight
+    candidates = [X[[_sample_index(rng, weights)]]]
+    closest = _squared_distances_to(X, x_squared_norms, candidates[0][0])
+
+    for _ in range(n_rounds):
+        potential = closest * weights
+        total = potential.sum(dtype=np.float64)
+        if total <= 0:
+            break
+        probs = np.minimum(1.0, oversampling_factor * k * potential / total)
+        picked = np.flatnonzero(rng.random(n_samples) < probs)
+        if picked.size == 0:
+            continue
+        new = X[picked]
+        _, dists = assign_clusters(X, new, x_squared_norms=x_squared_norms,
+                                   return_distances=True)
+        np.minimum(closest, dists, out=closest)
+        candidates.append(new)
+
+    candidates = np.vstack(candidates)
+    if len(candidates) < k:
+        extra = X[rng.choice(n_samples, k - len(candidates), replace=False)]
+        candidates = np.vstack((candidates, extra))
+
+    labels = assign_clusters(X, candidates, x_squared_norms=x_squared_norms)
+    weights = np.bincount(labels, weights=sample_weight,
+                          minlength=len(candidates)).astype(np.float64)
+    return _kmeans_plusplus(candidates, k, rng, _squared_norms(candidates),
+                            sample_weight=weights)
 
-def initialize_centroids(X, k):
+def initialize_centroids(X, k, random_state=None, init="random", x_squared_norms=None,
+                         n_rounds=5, oversampling_factor=2.0, sample_weight=None):
     """
-    Randomly selects `k` unique data points as initial centroids.
+    Selects `k` data points as initial centroids.
 
     Parameters:
     - X (np.ndarray): Dataset of shape (n_samples, n_features)
     - k (int): Number of clusters to initialize
+    - random_state (int, np.random.Generator, optional): Seed or generator;
+      defaults to the global NumPy random state
+    - init (str or np.ndarray): "random" picks `k` unique rows uniformly,
+      "k-means++" samples proportionally to D², "k-means||" runs
+      `n_rounds` oversampling rounds of k-means|| (better for large k);
+      an array of shape (k, n_features) is used as-is
+    - x_squared_norms (np.ndarray, optional): Precomputed squared row norms
+    - n_rounds (int): Oversampling rounds for "k-means||"
+    - oversampling_factor (float): Expected candidates per round, as a
+      multiple of `k`, for "k-means||"
+    - sample_weight (np.ndarray, optional): Point weights; heavier points are
+      proportionally more likely to be picked
 
     Returns:
     - np.ndarray: Initial centroids of shape (k, n_features)
 
     Raises:
-    - ValueError: If k > number of samples in X
+    - ValueError: If k > number of samples in X or `init` is unknown
     """
     n_samples = len(X)
     if k > n_samples:
@@ -31,43 +274,1306 @@ def initialize_centroids(X, k):
             f"Please choose k ≤ {n_samples}."
         )
 
-    indices = np.random.choice(n_samples, k, replace=False)
-    return X[indices]
+    if not isinstance(init, str):
+        centroids = np.array(init, dtype=np.asarray(X).dtype)
+        if centroids.shape != (k, np.shape(X)[1]):
+            raise ValueError(
+                f"❌ init array has shape {centroids.shape}, expected {(k, np.shape(X)[1])}."
+            )
+        return centroids
 
+    rng = _check_random_state(random_state)
+    if init == "random":
+        probs = None if sample_weight is None else sample_weight / np.sum(sample_weight)
+        indices = rng.choice(n_samples, k, replace=False, p=probs)
+        return X[indices]
 
-def assign_clusters(X, centroids):
+    X = _as_float_array(X)
+    if x_squared_norms is None:
+        x_squared_norms = _squared_norms(X)
+    if init == "k-means++":
+        return _kmeans_plusplus(X, k, rng, x_squared_norms, sample_weight=sample_weight)
+    if init == "k-means||":
+        return _kmeans_parallel_seeding(X, k, rng, x_squared_norms, n_rounds=n_rounds,
+                                        oversampling_factor=oversampling_factor,
+                                        sample_weight=sample_weight)
+    raise ValueError(
+        f"❌ Unknown init '{init}'. Use 'random', 'k-means++', 'k-means||' or an array."
+    )
+
+def assign_clusters(X, centroids, x_squared_norms=None, return_distances=False,
+                    block_rows=None, max_memory_mb=64):
     """
     Assigns each point to the nearest centroid based on Euclidean distance.
+
+    Distances are expanded as ||x||² - 2x·c + ||c||² so the heavy lifting is a
+    single matrix product per block of rows. Rows are processed in blocks so
+    the temporary (block_rows, k) distance matrix stays under `max_memory_mb`,
+    and no square root is taken.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - centroids (np.ndarray): Centroids of shape (k, n_features)
+    - x_squared_norms (np.ndarray, optional): Precomputed squared row norms of
+      `X`; pass them in when calling repeatedly on the same data. Only used
+      (and only computed) when `return_distances=True`
+    - return_distances (bool): Also return the squared distance of every point
+      to its assigned centroid
+    - block_rows (int, optional): Rows per block; derived from `max_memory_mb`
+      when not given
+    - max_memory_mb (float): Memory budget for the per-block distance matrix
+
+    Returns:
+    - np.ndarray: Cluster labels of shape (n_samples,)
+    - np.ndarray: Squared distances of shape (n_samples,), only when
+      `return_distances=True`
+    """
+    X = _as_float_array(X)
+    centroids = np.asarray(centroids, dtype=X.dtype)
+    n_samples, k = X.shape[0], centroids.shape[0]
+
+    # ||x||² only shifts each row's distances, so labels alone never need it
+    if return_distances and x_squared_norms is None:
+        x_squared_norms = _squared_norms(X)
+    c_squared_norms = _squared_norms(centroids)
+    if block_rows is None:
+        block_rows = _block_rows(k, X.dtype.itemsize, max_memory_mb)
+    block_rows = max(1, min(block_rows, n_samples))
+
+    labels = np.empty(n_samples, dtype=np.intp)
+    distances = np.empty(n_samples, dtype=X.dtype) if return_distances else None
+    buffer = np.empty((block_rows, k), dtype=X.dtype)
+
+    for start in range(0, n_samples, block_rows):
+        stop = min(start + block_rows, n_samples)
+        block = buffer[:stop - start]
+        # ||x||² is constant per row, so the argmin only needs -2x·c + ||c||²
+        np.matmul(X[start:stop], centroids.T, out=block)
+        block *= -2
+        block += c_squared_norms
+        block_labels = np.argmin(block, axis=1)
+        labels[start:stop] = block_labels
+        if return_distances:
+            best = block[np.arange(stop - start), block_labels]
+            best += x_squared_norms[start:stop]
+            # Cancellation can leave tiny negative values for points on a centroid
+            np.maximum(best, 0, out=best)
+            distances[start:stop] = best
+
+    if return_distances:
+        return labels, distances
+    return labels
+
+def _pairwise_distances(X, centroids, x_squared_norms, block_rows):
+    """
+    Yields (start, stop, block) with the Euclidean distances of each block of
+    rows of `X` to every centroid.
+    """
+    c_squared_norms = _squared_norms(centroids)
+    for start in range(0, len(X), block_rows):
+        stop = min(start + block_rows, len(X))
+        block = X[start:stop] @ centroids.T
+        block *= -2
+        block += c_squared_norms
+        block += x_squared_norms[start:stop, np.newaxis]
+        np.maximum(block, 0, out=block)
+        yield start, stop, np.sqrt(block, out=block)
+
+def _point_distances(X, rows, centroids, cols, max_memory_mb=64):
+    """
+    Euclidean distances between the pairs (X[rows[i]], centroids[cols[i]]).
+    """
+    out = np.empty(len(rows), dtype=X.dtype)
+    step = _block_rows(X.shape[1], X.dtype.itemsize, max_memory_mb)
+    for start in range(0, len(rows), step):
+        stop = min(start + step, len(rows))
+        diff = X[rows[start:stop]] - centroids[cols[start:stop]]
+        out[start:stop] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    return out
+
+def _centroid_drift(old, new):
+    return np.sqrt(_squared_norms(new - old))
+
+def _half_min_separation(centroids):
+    """
+    Pairwise centroid distances and, per centroid, half the distance to its
+    nearest other centroid.
+
+    Uses the same ||a||² - 2a·b + ||b||² expansion as `assign_clusters`, so
+    only a (k, k) matrix is built, never a (k, k, n_features) difference.
+    """
+    c_squared_norms = _squared_norms(centroids)
+    separation = centroids @ centroids.T
+    separation *= -2
+    separation += c_squared_norms
+    separation += c_squared_norms[:, np.newaxis]
+    np.maximum(separation, 0, out=separation)
+    np.sqrt(separation, out=separation)
+    np.fill_diagonal(separation, np.inf)
+    return separation, 0.5 * separation.min(axis=1)
+
+def _row_blocks(n_rows, block_rows, rows=None):
+    """
+    Yields blocks of `block_rows` rows: plain slices, or pieces of `rows`.
+    """
+    n = n_rows if rows is None else len(rows)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        yield slice(start, stop) if rows is None else rows[start:stop]
+
+class _HamerlyBounds:
+    """
+    Hamerly's accelerated assignment: one upper bound on the distance to the
+    assigned centroid and one lower bound on the distance to any other.
+    """
+
+    def __init__(self, X, x_squared_norms, max_memory_mb=64):
+        self.X = X
+        self.x_squared_norms = x_squared_norms
+        self.max_memory_mb = max_memory_mb
+        self.centroids = None
+
+    def _full_assign(self, rows=None):
+        # X is gathered one cache-sized block at a time; the first pass
+        # (rows=None) only slices
+        k = len(self.centroids)
+        block_rows = _block_rows(k + self.X.shape[1], self.X.dtype.itemsize,
+                                 min(self.max_memory_mb, 4))
+        for idx in _row_blocks(len(self.X), block_rows, rows):
+            _, _, dists = next(_pairwise_distances(self.X[idx], self.centroids,
+                                                   self.x_squared_norms[idx], block_rows))
+            arange = np.arange(len(dists))
+            nearest = np.argmin(dists, axis=1)
+            self.labels[idx] = nearest
+            self.upper[idx] = dists[arange, nearest]
+            if k > 1:
+                dists[arange, nearest] = np.inf
+                self.lower[idx] = dists.min(axis=1)
+
+    def assign(self, centroids):
+        """
+        Assigns points to `centroids`, returning (labels, n_skipped) where
+        n_skipped is the number of point-centroid distances not evaluated.
+        """
+        n_samples, k = len(self.X), len(centroids)
+        if self.centroids is None:
+            self.centroids = centroids
+            self.labels = np.empty(n_samples, dtype=np.intp)
+            self.upper = np.empty(n_samples, dtype=self.X.dtype)
+            self.lower = np.full(n_samples, np.inf, dtype=self.X.dtype)
+            self._full_assign()
+            return self.labels, 0
+
+        drift = _centroid_drift(self.centroids, centroids)
+        self.centroids = centroids
+        self.upper += drift[self.labels]
+        if k > 1:
+            # Each point's lower bound shrinks by the largest drift of any
+            # centroid other than its own
+            order = np.argsort(drift)
+            largest, second = drift[order[-1]], drift[order[-2]]
+            self.lower -= np.where(self.labels == order[-1], second, largest)
+
+        _, half_sep = _half_min_separation(centroids)
+        bound = np.maximum(half_sep[self.labels], self.lower)
+        candidates = np.flatnonzero(self.upper > bound)
+        self.upper[candidates] = _point_distances(
+            self.X, candidates, centroids, self.labels[candidates], self.max_memory_mb
+        )
+        remaining = candidates[self.upper[candidates] > bound[candidates]]
+        self._full_assign(remaining)
+
+        evaluated = len(candidates) + len(remaining) * k
+        return self.labels, n_samples * k - evaluated
+
+class _ElkanBounds:
+    """
+    Elkan's accelerated assignment: an upper bound per point and a lower bound
+    per point-centroid pair, pruned with inter-centroid distances.
+
+    Lower bounds are stored offset by each centroid's cumulative drift, so
+    moving the centroids costs O(k) instead of a pass over the n×k matrix,
+    and a Hamerly-style bound per point screens rows in O(n). Only rows that
+    survive both screens read their n×k bounds, one cache-sized block at a
+    time, and rows that still may change label are recomputed against every
+    centroid with one GEMM, which also refreshes all of their bounds.
+    """
+
+    def __init__(self, X, x_squared_norms, max_memory_mb=64):
+        self.X = X
+        self.x_squared_norms = x_squared_norms
+        self.max_memory_mb = max_memory_mb
+        self.centroids = None
+
+    def _refresh(self, rows, centroids):
+        # Exact distances from `rows` to every centroid, in cache-sized row blocks
+        k = len(centroids)
+        block_rows = _block_rows(k + self.X.shape[1], self.X.dtype.itemsize,
+                                 min(self.max_memory_mb, 4))
+        for idx in _row_blocks(len(self.X), block_rows, rows):
+            _, _, dists = next(_pairwise_distances(self.X[idx], centroids,
+                                                   self.x_squared_norms[idx], block_rows))
+            arange = np.arange(len(dists))
+            nearest = np.argmin(dists, axis=1)
+            self.labels[idx] = nearest
+            self.upper[idx] = dists[arange, nearest]
+            self.lower[idx] = dists + self.offset
+            dists[arange, nearest] = np.inf
+            self.floor[idx] = dists.min(axis=1)
+
+    def assign(self, centroids):
+        """
+        Assigns points to `centroids`, returning (labels, n_skipped) where
+        n_skipped is the number of point-centroid distances not evaluated.
+        """
+        n_samples, k = len(self.X), len(centroids)
+        if self.centroids is None:
+            self.centroids = centroids
+            self.offset = np.zeros(k, dtype=self.X.dtype)
+            self.labels = np.empty(n_samples, dtype=np.intp)
+            self.upper = np.empty(n_samples, dtype=self.X.dtype)
+            self.lower = np.empty((n_samples, k), dtype=self.X.dtype)
+            self.floor = np.empty(n_samples, dtype=self.X.dtype)
+            self._refresh(None, centroids)
+            return self.labels, 0
+
+        # The lower bound on d(x, c) is lower[x, c] - offset[c]; floor[x] bounds
+        # every centroid but x's own, as in Hamerly
+        drift = _centroid_drift(self.centroids, centroids)
+        self.centroids = centroids
+        self.offset += drift
+        self.upper += drift[self.labels]
+        if k > 1:
+            order = np.argsort(drift)
+            largest, second = drift[order[-1]], drift[order[-2]]
+            self.floor -= np.where(self.labels == order[-1], second, largest)
+
+        separation, half_sep = _half_min_separation(centroids)
+        separation *= 0.5
+        candidates = np.flatnonzero(
+            self.upper > np.maximum(half_sep[self.labels], self.floor)
+        )
+
+        if len(candidates) > n_samples // 2:
+            # Most rows are open anyway: slicing beats gathering and scattering them
+            self._refresh(None, centroids)
+            return self.labels, 0
+
+        evaluated = 0
+        block_rows = _block_rows(k, self.X.dtype.itemsize, min(self.max_memory_mb, 1))
+        for rows in _row_blocks(n_samples, block_rows, candidates):
+            labels = self.labels[rows]
+            bound = self.lower[rows]
+            bound -= self.offset
+            bound[np.arange(len(rows)), labels] = np.inf
+            floor = bound.min(axis=1)
+            self.floor[rows] = floor
+            open_rows = floor < self.upper[rows]
+            rows, labels, bound = rows[open_rows], labels[open_rows], bound[open_rows]
+            np.maximum(bound, separation[labels], out=bound)
+            open_rows = (bound < self.upper[rows, np.newaxis]).any(axis=1)
+            rows, labels, bound = rows[open_rows], labels[open_rows], bound[open_rows]
+            if not len(rows):
+                continue
+
+            # Tighten the upper bound, then keep only centroids it cannot rule out
+            upper = _point_distances(self.X, rows, centroids, labels, self.max_memory_mb)
+            self.upper[rows] = upper
+            evaluated += len(rows)
+
+            rows = rows[(bound < upper[:, np.newaxis]).any(axis=1)]
+            self._refresh(rows, centroids)
+            evaluated += len(rows) * k
+
+        return self.labels, n_samples * k - evaluated
+
+_SUM_BLOCK_ROWS = 65536
+
+def _cluster_sums_sparse(X, labels, k, weights):
+    # Sparse one-hot (k x rows) @ X per row block: one BLAS-backed pass over X
+    sums = np.zeros((k, X.shape[1]), dtype=np.float64)
+    for start in range(0, len(X), _SUM_BLOCK_ROWS):
+        block_labels = labels[start:start + _SUM_BLOCK_ROWS]
+        n = len(block_labels)
+        data = np.ones(n, dtype=X.dtype) if weights is None else weights[start:start + n].astype(X.dtype)
+        one_hot = sparse.csr_matrix((data, (block_labels, np.arange(n))), shape=(k, n))
+        sums += one_hot @ X[start:start + n]
+    return sums
+
+def _cluster_sums_one_hot(X, labels, k, weights):
+    # Dense one-hot GEMM per row block; cheap while k is small
+    sums = np.zeros((k, X.shape[1]), dtype=np.float64)
+    block_rows = max(1, min(_SUM_BLOCK_ROWS, (8 << 20) // (k * X.itemsize)))
+    for start in range(0, len(X), block_rows):
+        block_labels = labels[start:start + block_rows]
+        n = len(block_labels)
+        one_hot = np.zeros((n, k), dtype=X.dtype)
+        one_hot[np.arange(n), block_labels] = 1 if weights is None else weights[start:start + n]
+        sums += one_hot.T @ X[start:start + n]
+    return sums
+
+def _cluster_sums_segments(X, labels, k, weights):
+    # Stable sort by label, then one contiguous reduction per cluster segment
+    order = np.argsort(labels, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=k))))
+    sums = np.zeros((k, X.shape[1]), dtype=np.float64)
+    for c in np.flatnonzero(np.diff(bounds)):
+        rows = order[bounds[c]:bounds[c + 1]]
+        if weights is None:
+            sums[c] = X[rows].sum(axis=0, dtype=np.float64)
+        else:
+            sums[c] = weights[rows] @ X[rows]
+    return sums
+
+def _cluster_sums_bincount(X, labels, k, weights):
+    # One weighted bincount per feature; strided, so only worth it for tiny d
+    sums = np.empty((k, X.shape[1]), dtype=np.float64)
+    for j in range(X.shape[1]):
+        column = X[:, j] if weights is None else X[:, j] * weights
+        sums[:, j] = np.bincount(labels, weights=column, minlength=k)
+    return sums
+
+def _cluster_sums(X, labels, k, sample_weight=None):
     """
-    dists = np.linalg.norm(X[:, np.newaxis] - centroids, axis=2)
-    return np.argmin(dists, axis=1)
+    Per-cluster coordinate sums (accumulated in float64 across row blocks)
+    and point counts.
 
-def update_centroids(X, labels, k):
+    Uses a sparse one-hot matrix product when SciPy (an optional extra, not
+    in requirements.txt) is installed. Without it, falls back to per-feature
+    bincounts for d <= 4, a dense one-hot GEMM for k <= 32, and otherwise
+    sorted label segments. Each path reads X once; the benchmark reports
+    every strategy (see benchmarks/bench_centroid_update.py).
+    """
+    counts = np.bincount(labels, weights=sample_weight, minlength=k).astype(np.float64)
+    if sparse is not None:
+        strategy = _cluster_sums_sparse
+    elif X.shape[1] <= 4:
+        strategy = _cluster_sums_bincount
+    elif k <= 32:
+        strategy = _cluster_sums_one_hot
+    else:
+        strategy = _cluster_sums_segments
+    return strategy(X, labels, k, sample_weight), counts
+
+def update_centroids(X, labels, k, sample_weight=None, old_centroids=None,
+                     empty_strategy="keep", distances=None, return_counts=False):
     """
     Updates centroids by computing mean of all points assigned to each cluster.
+
+    Sums and counts are gathered in one bincount reduction instead of a
+    boolean mask per cluster. Clusters that end up empty are handled
+    deterministically: "keep" leaves them at `old_centroids` (falling back to
+    "farthest" when none are given), "farthest" moves them onto the points
+    farthest from their assigned centroid.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - labels (np.ndarray): Cluster index of each point, shape (n_samples,)
+    - k (int): Number of clusters
+    - sample_weight (np.ndarray, optional): Weight of each point
+    - old_centroids (np.ndarray, optional): Previous centroids, shape (k, n_features)
+    - empty_strategy (str): "keep" or "farthest"
+    - distances (np.ndarray, optional): Squared distance of each point to its
+      assigned centroid, used to rank points for "farthest"
+    - return_counts (bool): Also return the (weighted) size of each cluster
+
+    Returns:
+    - np.ndarray: New centroids of shape (k, n_features)
+    - np.ndarray: Cluster sizes of shape (k,), only when `return_counts=True`
+    """
+    if empty_strategy not in ("keep", "farthest"):
+        raise ValueError(
+            f"❌ Unknown empty_strategy '{empty_strategy}'. Use 'keep' or 'farthest'."
+        )
+    X = _as_float_array(X)
+    sums, counts = _cluster_sums(X, labels, k, sample_weight=sample_weight)
+
+    filled = counts > 0
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+    centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+
+    empty = np.flatnonzero(~filled)
+    if len(empty):
+        if empty_strategy == "keep" and old_centroids is not None:
+            centroids[empty] = old_centroids[empty]
+        else:
+            if distances is None:
+                # Empty clusters have no members, so only filled centroids are read
+                diff = X - centroids[labels]
+                distances = np.einsum("ij,ij->i", diff, diff)
+            farthest = np.argsort(-distances, kind="stable")[:len(empty)]
+            centroids[empty[:len(farthest)]] = X[farthest]
+
+    if return_counts:
+        return centroids, counts
+    return centroids
+
+def _effective_n_jobs(n_jobs):
     """
-    return np.array([X[labels == i].mean(axis=0) for i in range(k)])
+    Resolves `n_jobs` (None → 1, negative → counted back from the CPU count).
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
 
-def kmeans(X, k=3, max_iters=100, tol=1e-4):
+def _spawn_seeds(random_state, n):
     """
-    K-means algorithm: returns final centroids and labels.
+    Spawns `n` independent ``SeedSequence`` streams from `random_state`.
+    """
+    if random_state is None or isinstance(random_state, (np.random.Generator,
+                                                         np.random.RandomState)):
+        random_state = int(_check_random_state(random_state).choice(2**31))
+    return np.random.SeedSequence(random_state).spawn(n)
+
+def _share_array(X):
+    """
+    Copies `X` into a new shared memory block.
+
+    Returns the block (the caller must close and unlink it) and a small,
+    picklable spec that workers pass to `_attach_shared`.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+    np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[...] = X
+    return shm, (shm.name, X.shape, X.dtype.str)
+
+def _attach_shared(spec):
+    """
+    Maps a block created by `_share_array`; returns (shm, array) without copying.
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+class _BestInertia:
+    """
+    Lowest inertia reached so far by any concurrent restart, finished or
+    still running (Lloyd iterations never increase inertia, so a running
+    restart's current value is an achievable bound).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = np.inf
+
+    def get(self):
+        return self.value
+
+    def update(self, inertia):
+        with self._lock:
+            self.value = min(self.value, inertia)
+
+class _SharedBestInertia:
+    """
+    `_BestInertia` backed by a ``multiprocessing.Value`` for process pools.
+    """
+
+    def __init__(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value.value
+
+    def update(self, inertia):
+        with self._value.get_lock():
+            self._value.value = min(self._value.value, inertia)
+
+_worker_best_inertia = None
+
+def _init_restart_worker(value):
+    global _worker_best_inertia
+    _worker_best_inertia = _SharedBestInertia(value)
+
+def _kmeans_single(X, k, x_squared_norms, max_iters, tol, init, random_state,
+                   algorithm, sample_weight=None, best=None, prune_ratio=None,
+                   prune_after=5, callback=None, label_change_tol=None, restart=0):
+    """
+    One seeded K-means run. Returns (centroids, labels, info), or None when
+    the run was pruned: from iteration `prune_after` on, its current inertia
+    is published to `best` and compared against the best inertia any
+    restart has reached so far, and the run stops once it is above
+    `prune_ratio` times that. Lloyd checks every iteration (its distances
+    are free); the bound-based algorithms check every `prune_after`
+    iterations, since their inertia costs an extra pass.
+
+    Timing and label-change bookkeeping only happen when `callback` or
+    `label_change_tol` is set, so the plain loop pays nothing for them.
     """
-    centroids = initialize_centroids(X, k)
+    start = time.perf_counter()
+    centroids = initialize_centroids(X, k, random_state=random_state, init=init,
+                                     x_squared_norms=x_squared_norms,
+                                     sample_weight=sample_weight)
+    seeding_time = time.perf_counter() - start
+
+    bounds = None
+    if algorithm == "elkan":
+        bounds = _ElkanBounds(X, x_squared_norms)
+    elif algorithm == "hamerly":
+        bounds = _HamerlyBounds(X, x_squared_norms)
+    distances_skipped = []
+    tracing = callback is not None
+    previous_labels = None
     
-    for _ in range(max_iters):
-        labels = assign_clusters(X, centroids)
-        new_centroids = update_centroids(X, labels, k)
+    for n_iter in range(1, max_iters + 1):
+        if tracing:
+            assign_start = time.perf_counter()
+        if bounds is None:
+            labels, distances = assign_clusters(X, centroids, x_squared_norms=x_squared_norms,
+                                                return_distances=True)
+            distances_skipped.append(0)
+        else:
+            labels, skipped = bounds.assign(centroids)
+            distances_skipped.append(skipped)
+        if tracing:
+            update_start = time.perf_counter()
+
+        if (prune_ratio is not None and best is not None and n_iter >= prune_after
+                and (bounds is None or (n_iter - prune_after) % prune_after == 0)):
+            inertia = float(compute_cluster_inertia(
+                X, centroids, labels, sample_weight=sample_weight,
+                distances=None if bounds is not None else distances,
+            ))
+            best.update(inertia)
+            if inertia > prune_ratio * best.get():
+                return None
+
+        new_centroids = update_centroids(X, labels, k, sample_weight=sample_weight,
+                                         old_centroids=centroids)
+        converged = np.allclose(centroids, new_centroids, atol=tol)
+
+        if tracing or label_change_tol is not None:
+            if previous_labels is None:
+                n_changed = len(labels)
+            else:
+                n_changed = int(np.count_nonzero(labels != previous_labels))
+                if label_change_tol is not None and n_changed <= label_change_tol:
+                    converged = True
+            previous_labels = labels.copy()
+
+        if tracing:
+            record = {
+                "restart": restart,
+                "iteration": n_iter,
+                "assign_time": update_start - assign_start,
+                "update_time": time.perf_counter() - update_start,
+                "inertia": float(compute_cluster_inertia(
+                    X, centroids, labels, sample_weight=sample_weight,
+                    distances=None if bounds is not None else distances,
+                )),
+                "n_changed": n_changed,
+                "centroid_shift": float(np.sqrt(_squared_norms(new_centroids - centroids).max())),
+                "distances_skipped": distances_skipped[-1],
+            }
+            if callback(record):
+                converged = True
         
-        if np.allclose(centroids, new_centroids, atol=tol):
+        if converged:
             break
         
         centroids = new_centroids
 
+    if bounds is None:
+        inertia = compute_cluster_inertia(X, centroids, labels, distances=distances,
+                                          sample_weight=sample_weight)
+    else:
+        inertia = compute_cluster_inertia(X, bounds.centroids, labels,
+                                          sample_weight=sample_weight)
+    inertia = float(inertia)
+    if best is not None:
+        best.update(inertia)
+    info = {
+        "seeding_time": seeding_time,
+        "lloyd_time": time.perf_counter() - start - seeding_time,
+        "n_iter": n_iter,
+        "inertia": inertia,
+        "distances_skipped": distances_skipped,
+    }
+    return centroids, labels, info
+
+class KMeansTrace:
+    """
+    `kmeans` callback that records every per-iteration report.
+
+    With thread-pool restarts the records of concurrent restarts interleave;
+    select one run with ``as_arrays(restart=i)``.
+
+    Example:
+        trace = KMeansTrace()
+        kmeans(X, k=8, callback=trace)
+        trace.as_arrays()["inertia"]  # inertia trajectory
+
+    Parameters:
+    - stop_after_seconds (float, optional): Ask `kmeans` to stop once the
+      traced iterations have taken this long
+    """
+
+    def __init__(self, stop_after_seconds=None):
+        self.records = []
+        self.stop_after_seconds = stop_after_seconds
+
+    def __call__(self, record):
+        self.records.append(record)
+        if self.stop_after_seconds is None:
+            return False
+        return self.total_time() >= self.stop_after_seconds
+
+    def total_time(self):
+        """Seconds spent in the assign and update phases so far."""
+        return sum(r["assign_time"] + r["update_time"] for r in self.records)
+
+    def as_arrays(self, restart=None):
+        """
+        Records as a dict of NumPy arrays, one entry per field, optionally
+        restricted to one restart (in iteration order).
+        """
+        records = list(self.records)
+        if restart is not None:
+            records = sorted((r for r in records if r["restart"] == restart),
+                             key=lambda r: r["iteration"])
+        if not records:
+            return {}
+        return {key: np.array([r[key] for r in records]) for key in records[0]}
+
+def _restart_worker(spec, k, kwargs):
+    shm, X = _attach_shared(spec)
+    try:
+        return _kmeans_single(X, k, _squared_norms(X), best=_worker_best_inertia, **kwargs)
+    finally:
+        del X
+        shm.close()
+
+def kmeans(X, k=3, max_iters=100, tol=1e-4, init="random", random_state=None,
+           algorithm="lloyd", n_init=1, n_jobs=None, executor="thread",
+           prune_ratio=2.0, dtype=None, sample_weight=None, callback=None,
+           label_change_tol=None, return_info=False):
+    """
+    K-means algorithm: returns final centroids and labels.
+
+    With `n_init` > 1, independent restarts (each with its own
+    ``SeedSequence``-spawned stream) run on a thread or process pool and the
+    lowest-inertia solution is returned. From the fifth iteration on, a
+    restart whose inertia is above `prune_ratio` times the best inertia any
+    restart (running or finished) has reached is abandoned early.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - k (int): Number of clusters
+    - max_iters (int): Maximum number of Lloyd iterations
+    - tol (float): Absolute tolerance on centroid movement
+    - init (str or np.ndarray): Seeding strategy, see `initialize_centroids`
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    - algorithm (str): "lloyd" recomputes every distance each iteration;
+      "elkan" (n×k lower bounds) and "hamerly" (one lower bound per point)
+      use the triangle inequality to skip distances that cannot change a label.
+      Hamerly is usually the fastest; Elkan's bound matrix only pays off for
+      larger k and n_features and costs n×k extra memory (see
+      benchmarks/bench_kmeans_algorithms.py)
+    - n_init (int): Number of restarts
+    - n_jobs (int, optional): Restarts run concurrently (-1 for all CPUs)
+    - executor (str): "thread" or "process" pool for the restarts; processes
+      read `X` from shared memory
+    - prune_ratio (float or None): Early-abandon threshold for restarts
+      (>= 1); None always runs every restart to completion
+    - dtype (np.dtype, optional): Compute dtype; float32 and float64 inputs
+      otherwise run in their own precision (sums are still accumulated in
+      float64), anything else is converted to float64
+    - sample_weight (np.ndarray, optional): Weight of each point, e.g. the
+      multiplicities from `compress_duplicates`
+    - callback (callable, optional): Called after every iteration with a dict
+      holding "restart" (index of the run, 0 without restarts), "iteration",
+      "assign_time", "update_time", "inertia", "n_changed" (labels that
+      moved), "centroid_shift" and "distances_skipped"; returning True stops
+      the run that reported. With thread-pool restarts it is called
+      concurrently from every restart and only stops the calling restart.
+      `KMeansTrace` records these. Not available with process-pool restarts
+    - label_change_tol (int, optional): Also stop once at most this many
+      labels change between iterations
+    - return_info (bool): Also return a dict with "seeding_time" and
+      "lloyd_time" (seconds), "n_iter", "inertia" and "distances_skipped"
+      (distance evaluations avoided, per iteration); with restarts it also
+      holds "inertias" (None for pruned restarts) and "n_pruned"
+
+    Returns:
+    - tuple: (centroids, labels), or (centroids, labels, info)
+    """
+    if algorithm not in ("lloyd", "elkan", "hamerly"):
+        raise ValueError(
+            f"❌ Unknown algorithm '{algorithm}'. Use 'lloyd', 'elkan' or 'hamerly'."
+        )
+    if executor not in ("thread", "process"):
+        raise ValueError(f"❌ Unknown executor '{executor}'. Use 'thread' or 'process'.")
+    if prune_ratio is not None and prune_ratio < 1:
+        raise ValueError("❌ prune_ratio must be >= 1 (or None to disable pruning).")
+    if callback is not None and executor == "process" and n_init > 1:
+        raise ValueError("❌ callback cannot be used with executor='process'.")
+
+    X = _as_float_array(X, dtype=dtype)
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=np.float64)
+    kwargs = {"max_iters": max_iters, "tol": tol, "init": init, "algorithm": algorithm,
+              "sample_weight": sample_weight, "callback": callback,
+              "label_change_tol": label_change_tol}
+
+    if n_init == 1:
+        centroids, labels, info = _kmeans_single(X, k, _squared_norms(X),
+                                                 random_state=random_state, **kwargs)
+        return (centroids, labels, info) if return_info else (centroids, labels)
+
+    kwargs["prune_ratio"] = prune_ratio
+    seeds = [np.random.default_rng(s) for s in _spawn_seeds(random_state, n_init)]
+    n_jobs = min(_effective_n_jobs(n_jobs), n_init)
+
+    if executor == "process" and n_jobs > 1:
+        shm, spec = _share_array(X)
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_restart_worker,
+                                     initargs=(multiprocessing.Value("d", np.inf),)) as pool:
+                futures = [pool.submit(_restart_worker, spec, k,
+                                       dict(kwargs, random_state=seed, restart=i))
+                           for i, seed in enumerate(seeds)]
+                runs = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        x_squared_norms = _squared_norms(X)
+        best = _BestInertia()
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_kmeans_single, X, k, x_squared_norms, best=best,
+                                   random_state=seed, restart=i, **kwargs)
+                       for i, seed in enumerate(seeds)]
+            runs = [future.result() for future in futures]
+
+    inertias = [None if run is None else run[2]["inertia"] for run in runs]
+    best_run = min((run for run in runs if run is not None), key=lambda run: run[2]["inertia"])
+    centroids, labels, info = best_run
+    if not return_info:
+        return centroids, labels
+    info = dict(info, inertias=inertias, n_pruned=inertias.count(None))
+    return centroids, labels, info
+
+def _data_parallel_worker(rank, shard, specs, barrier, stop):
+    """
+    Worker loop of `kmeans_data_parallel`: waits for new centroids, reduces
+    its shard to per-cluster sums/counts in shared memory, and repeats.
+    """
+    attached = [_attach_shared(spec) for spec in specs]
+    X, centroids, labels, sums, counts, inertia = [array for _, array in attached]
+    start, stop_row = shard
+    X_shard = X[start:stop_row]
+    x_squared_norms = _squared_norms(X_shard)
+    try:
+        while True:
+            barrier.wait()
+            if stop.value:
+                break
+            shard_labels, distances = assign_clusters(X_shard, centroids,
+                                                      x_squared_norms=x_squared_norms,
+                                                      return_distances=True)
+            labels[start:stop_row] = shard_labels
+            sums[rank], counts[rank] = _cluster_sums(X_shard, shard_labels, len(centroids))
+            inertia[rank] = np.sum(distances, dtype=np.float64)
+            barrier.wait()
+    except Exception:
+        # Wake the driver (and other workers) instead of leaving them blocked
+        barrier.abort()
+        raise
+    finally:
+        del X, X_shard, centroids, labels, sums, counts, inertia
+        for shm, _ in attached:
+            shm.close()
+
+def _watch_workers(workers, barrier, done, exited, poll=0.2):
+    """
+    Driver-side watchdog: aborts `barrier` as soon as a worker process exits
+    while the run is still in progress (OOM kill, SIGKILL, native crash),
+    which a Python-level ``except`` in the worker never sees. The exit codes
+    are recorded in `exited` (rank -> code).
+    """
+    while not done.wait(poll):
+        exited.update((rank, worker.exitcode) for rank, worker in enumerate(workers)
+                      if worker.exitcode is not None)
+        if exited:
+            barrier.abort()
+            return
+
+def kmeans_data_parallel(X, k=3, n_jobs=-1, max_iters=100, tol=1e-4, init="k-means++",
+                         random_state=None, timeout=None, return_info=False):
+    """
+    Data-parallel K-means on worker processes over shared memory.
+
+    `X` is copied into ``multiprocessing.shared_memory`` once and split into
+    one row shard per worker. Each iteration the driver writes the centroids
+    into a shared buffer, the workers assign their shard and write partial
+    per-cluster sums and counts into shared buffers, and the driver reduces
+    them. Workers are synchronised with a barrier, so nothing is pickled
+    after start-up. A watchdog thread aborts the barrier if a worker process
+    dies, so the driver raises instead of hanging.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - k (int): Number of clusters
+    - n_jobs (int): Number of worker processes (-1 for all CPUs)
+    - max_iters (int): Maximum number of iterations
+    - tol (float): Absolute tolerance on centroid movement
+    - init (str or np.ndarray): Seeding strategy, see `initialize_centroids`
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    - timeout (float, optional): Seconds the driver waits for the workers at
+      each synchronisation point before giving up (None waits as long as the
+      workers are alive)
+    - return_info (bool): Also return a dict with "n_iter" and "inertia"
+
+    Returns:
+    - tuple: (centroids, labels), or (centroids, labels, info)
+    """
+    X = _as_float_array(X)
+    n_samples, n_features = X.shape
+    n_jobs = min(_effective_n_jobs(n_jobs), n_samples)
+    centroids = initialize_centroids(X, k, random_state=random_state, init=init)
+
+    buffers = [
+        X,
+        centroids.astype(X.dtype),
+        np.zeros(n_samples, dtype=np.intp),
+        np.zeros((n_jobs, k, n_features), dtype=np.float64),
+        np.zeros((n_jobs, k), dtype=np.float64),
+        np.zeros(n_jobs, dtype=np.float64),
+    ]
+    shared = [_share_array(buffer) for buffer in buffers]
+    specs = [spec for _, spec in shared]
+    views = [_attach_shared(spec) for spec in specs]
+    _, shared_centroids, shared_labels, sums, counts, inertia = [array for _, array in views]
+
+    context = multiprocessing.get_context()
+    barrier = context.Barrier(n_jobs + 1)
+    stop = context.Value("b", 0)
+    bounds = np.linspace(0, n_samples, n_jobs + 1).astype(int)
+    workers = [
+        context.Process(target=_data_parallel_worker,
+                        args=(rank, (bounds[rank], bounds[rank + 1]), specs, barrier, stop),
+                        daemon=True)
+        for rank in range(n_jobs)
+    ]
+    for worker in workers:
+        worker.start()
+    done, exited = threading.Event(), {}
+    watchdog = threading.Thread(target=_watch_workers, args=(workers, barrier, done, exited),
+                                daemon=True)
+    watchdog.start()
+
+    try:
+        for n_iter in range(1, max_iters + 1):
+            barrier.wait(timeout)  # workers read the centroids
+            barrier.wait(timeout)  # workers have written their partial sums
+            total_sums, total_counts = sums.sum(axis=0), counts.sum(axis=0)
+            filled = total_counts > 0
+            new_centroids = centroids.copy()
+            new_centroids[filled] = total_sums[filled] / total_counts[filled, np.newaxis]
+
+            if np.allclose(centroids, new_centroids, atol=tol):
+                break
+
+            centroids = new_centroids
+            shared_centroids[...] = centroids
+        labels = shared_labels.copy()
+        total_inertia = float(inertia.sum())
+        stop.value = 1
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        done.set()
+        watchdog.join()
+        if exited:
+            raise RuntimeError(f"❌ kmeans_data_parallel worker(s) exited mid-run "
+                               f"(rank: exit code {exited}); see any traceback above.")
+        raise RuntimeError(f"❌ kmeans_data_parallel workers did not reach the barrier within "
+                           f"{timeout} seconds.")
+    finally:
+        done.set()
+        watchdog.join()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        del shared_centroids, shared_labels, sums, counts, inertia
+        for shm, _ in views:
+            shm.close()
+        for shm, _ in shared:
+            shm.close()
+            shm.unlink()
+
+    if not return_info:
+        return centroids, labels
+    return centroids, labels, {"n_iter": n_iter, "inertia": total_inertia}
+
+def minibatch_kmeans(X, k=3, batch_size=1024, max_iters=100, tol=1e-4,
+                     max_no_improvement=10, compute_labels=True, init="random",
+                     random_state=None, dtype=None):
+    """
+    Mini-batch K-means: updates centroids from small random batches of `X`.
+
+    Each centroid moves towards the mean of its batch members with a learning
+    rate of 1 / (number of points it has absorbed so far), so early batches
+    move it a lot and later ones only fine-tune it. Training stops when the
+    centroids stop moving (`tol`) or when an exponentially smoothed estimate
+    of the batch inertia has not improved for `max_no_improvement` batches.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - k (int): Number of clusters
+    - batch_size (int): Number of points drawn per step
+    - max_iters (int): Maximum number of passes over the data (epochs)
+    - tol (float): Absolute tolerance on centroid movement between steps
+    - max_no_improvement (int or None): Patience of the smoothed inertia early
+      stopping; None disables it
+    - compute_labels (bool): Run a final full assignment pass; when False the
+      returned labels are None
+    - init (str or np.ndarray): Seeding strategy, see `initialize_centroids`
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    - dtype (np.dtype, optional): Compute dtype, see `kmeans`
+
+    Returns:
+    - tuple: (centroids, labels)
+    """
+    X = _as_float_array(X, dtype=dtype)
+    rng = _check_random_state(random_state)
+    n_samples = len(X)
+    batch_size = min(batch_size, n_samples)
+    n_steps = max_iters * int(np.ceil(n_samples / batch_size))
+    # Smoothing factor roughly averages the inertia over one epoch
+    alpha = min(1.0, 2.0 * batch_size / (n_samples + 1))
+
+    centroids = initialize_centroids(X, k, random_state=rng, init=init).astype(X.dtype)
+    counts = np.zeros(k, dtype=np.float64)
+    smoothed_inertia = None
+    best_inertia = np.inf
+    no_improvement = 0
+
+    for _ in range(n_steps):
+        batch = X[rng.choice(n_samples, batch_size)]
+        labels, distances = assign_clusters(batch, centroids, return_distances=True)
+        sums, batch_counts = _cluster_sums(batch, labels, k)
+
+        hit = batch_counts > 0
+        counts[hit] += batch_counts[hit]
+        learning_rate = batch_counts[hit] / counts[hit]
+        new_centroids = centroids.copy()
+        new_centroids[hit] += learning_rate[:, np.newaxis] * (
+            sums[hit] / batch_counts[hit, np.newaxis] - centroids[hit]
+        )
+
+        converged = np.allclose(centroids, new_centroids, atol=tol)
+        centroids = new_centroids
+        if converged:
+            break
+
+        batch_inertia = np.sum(distances, dtype=np.float64) / batch_size
+        if smoothed_inertia is None:
+            smoothed_inertia = batch_inertia
+        else:
+            smoothed_inertia += alpha * (batch_inertia - smoothed_inertia)
+
+        if smoothed_inertia < best_inertia:
+            best_inertia = smoothed_inertia
+            no_improvement = 0
+        else:
+            no_improvement += 1
+        if max_no_improvement is not None and no_improvement >= max_no_improvement:
+            break
+
+    labels = assign_clusters(X, centroids) if compute_labels else None
     return centroids, labels
 
-def compute_cluster_inertia(X, centroids, labels):
+def _advise_sequential(X):
+    """
+    Hints the OS to read a memory map ahead and drop pages behind the reader.
+    """
+    handle = getattr(X, "_mmap", None)
+    if handle is not None and hasattr(handle, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        handle.madvise(mmap.MADV_SEQUENTIAL)
+
+def kmeans_memmap(X, k=3, max_iters=100, tol=1e-4, chunk_rows=65536, labels_out=None,
+                  init="k-means++", init_size=None, random_state=None, dtype=None,
+                  return_info=False):
+    """
+    Out-of-core K-means over a memory-mapped (or any row-sliceable) array.
+
+    Every pass reads `X` in sequential chunks of `chunk_rows` rows, assigns
+    each chunk and accumulates per-cluster sums and counts, so only one chunk
+    is ever materialised. Labels are streamed into `labels_out` on each pass.
+
+    Parameters:
+    - X (np.memmap or np.ndarray): Dataset of shape (n_samples, n_features),
+      e.g. from `io_utils.load_memmap`
+    - k (int): Number of clusters
+    - max_iters (int): Maximum number of passes
+    - tol (float): Absolute tolerance on centroid movement
+    - chunk_rows (int): Rows read per chunk
+    - labels_out (str, os.PathLike or np.ndarray, optional): Path of an int32
+      memmap to create, or an existing array of shape (n_samples,); labels
+      are kept in memory when omitted
+    - init (str or np.ndarray): Seeding strategy, run on a random sample
+    - init_size (int, optional): Rows sampled for seeding (default max(10000, 3k))
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    - dtype (np.dtype, optional): Compute dtype for each chunk, see `kmeans`
+    - return_info (bool): Also return a dict with "n_iter" and "inertia"
+
+    Returns:
+    - tuple: (centroids, labels), or (centroids, labels, info)
+    """
+    n_samples = len(X)
+    rng = _check_random_state(random_state)
+    _advise_sequential(X)
+
+    if init_size is None:
+        init_size = max(10000, 3 * k)
+    sample = np.sort(rng.choice(n_samples, min(init_size, n_samples), replace=False))
+    sample = _as_float_array(X[sample], dtype=dtype)
+    centroids = initialize_centroids(sample, k, random_state=rng, init=init)
+
+    if labels_out is None:
+        labels = np.empty(n_samples, dtype=np.int32)
+    elif isinstance(labels_out, (str, os.PathLike)):
+        labels = np.memmap(labels_out, dtype=np.int32, mode="w+", shape=(n_samples,))
+    else:
+        labels = labels_out
+
+    for n_iter in range(1, max_iters + 1):
+        sums = np.zeros((k, centroids.shape[1]), dtype=np.float64)
+        counts = np.zeros(k, dtype=np.float64)
+        inertia = 0.0
+        for start in range(0, n_samples, chunk_rows):
+            chunk = _as_float_array(X[start:start + chunk_rows], dtype=dtype)
+            chunk_labels, distances = assign_clusters(chunk, centroids, return_distances=True)
+            chunk_sums, chunk_counts = _cluster_sums(chunk, chunk_labels, k)
+            sums += chunk_sums
+            counts += chunk_counts
+            inertia += np.sum(distances, dtype=np.float64)
+            labels[start:start + len(chunk)] = chunk_labels
+
+        new_centroids = centroids.copy()
+        filled = counts > 0
+        new_centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+
+        if np.allclose(centroids, new_centroids, atol=tol):
+            break
+
+        centroids = new_centroids
+
+    if isinstance(labels, np.memmap):
+        labels.flush()
+    if not return_info:
+        return centroids, labels
+    return centroids, labels, {"n_iter": n_iter, "inertia": inertia}
+
+def compress_duplicates(X, resolution=None, sample_weight=None):
+    """
+    Collapses duplicate rows of `X` into weighted unique points.
+
+    With `resolution`, points are first snapped to a grid of that cell size
+    and every occupied cell becomes one point at the (weighted) mean of its
+    members. Clustering the result with `sample_weight=weights` costs time
+    proportional to the number of distinct points rather than raw rows, and
+    `labels[inverse]` maps the labels back onto the original rows.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - resolution (float or np.ndarray, optional): Grid cell size, per feature
+      or shared; None merges exact duplicates only
+    - sample_weight (np.ndarray, optional): Existing weight of each row
+
+    Returns:
+    - np.ndarray: Unique points of shape (n_unique, n_features)
+    - np.ndarray: Total weight of each unique point, shape (n_unique,)
+    - np.ndarray: Index of the unique point for each row, shape (n_samples,)
+    """
+    X = _as_float_array(X)
+    keys = X if resolution is None else np.floor(X / resolution).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n_unique = len(first)
+
+    if resolution is None:
+        points = X[first]
+        weights = np.bincount(inverse, weights=sample_weight, minlength=n_unique)
+    else:
+        sums, weights = _cluster_sums(X, inverse, n_unique, sample_weight=sample_weight)
+        points = (sums / weights[:, np.newaxis]).astype(X.dtype)
+    return points, weights.astype(np.float64), inverse
+
+def _stream_assign(X, centroids, chunk_rows, sample_weight=None, labels_out=None):
+    """
+    Assigns `X` chunk by chunk. Returns the (weighted) inertia and the
+    (weighted) size of each cluster; only `labels_out` grows with n_samples.
+    """
+    centroids = _as_float_array(centroids)
+    inertia = 0.0
+    counts = np.zeros(len(centroids), dtype=np.float64)
+    for start in range(0, len(X), chunk_rows):
+        chunk = _as_float_array(X[start:start + chunk_rows], dtype=centroids.dtype)
+        stop = start + len(chunk)
+        weights = None if sample_weight is None else sample_weight[start:stop]
+        labels, distances = assign_clusters(chunk, centroids, return_distances=True)
+        inertia += compute_cluster_inertia(chunk, centroids, labels, distances=distances,
+                                           sample_weight=weights)
+        counts += np.bincount(labels, weights=weights, minlength=len(centroids))
+        if labels_out is not None:
+            labels_out[start:stop] = labels
+    return inertia, counts
+
+def compute_streaming_inertia(X, centroids, chunk_rows=65536, sample_weight=None,
+                              labels_out=None):
+    """
+    Inertia of `centroids` on the full dataset, computed in one sequential
+    pass over `chunk_rows`-row chunks, so it also works on memmaps larger
+    than RAM.
+
+    Parameters:
+    - X (np.ndarray or np.memmap): Dataset of shape (n_samples, n_features)
+    - centroids (np.ndarray): Centroids of shape (k, n_features)
+    - chunk_rows (int): Rows read per chunk
+    - sample_weight (np.ndarray, optional): Weight of each point
+    - labels_out (np.ndarray, optional): Array of shape (n_samples,) that
+      receives the labels during the same pass
+
+    Returns:
+    - float: Total (weighted) within-cluster sum of squares
+    """
+    return float(_stream_assign(X, centroids, chunk_rows, sample_weight=sample_weight,
+                                labels_out=labels_out)[0])
+
+def build_coreset(X, k, coreset_size=None, seed_size=None, chunk_rows=65536,
+                  sample_weight=None, random_state=None):
+    """
+    Builds a small weighted sample of `X` whose k-means cost approximates the
+    cost on the full data (sensitivity sampling, Bachem et al. 2018).
+
+    A cheap k-means++ seeding on a uniform subsample bounds how much each
+    point can matter: its sensitivity is its share of the seeding cost plus
+    one over the size of its seed cluster. Points are drawn with probability
+    proportional to sensitivity and weighted by the inverse probability, so
+    the weighted coreset cost is an unbiased estimate of the full cost. With
+    on the order of d·k·log(k)/ε² points the relative error is at most ε
+    with high probability.
+
+    The data is read in two sequential passes of `chunk_rows` rows. The first
+    only keeps the seeding cost and the seed cluster sizes; since the
+    sensitivities then sum to a known total, the second recomputes them per
+    chunk and draws that chunk's share of the sample. Memory is
+    O(chunk_rows + coreset_size), so memmaps larger than RAM work.
+
+    Parameters:
+    - X (np.ndarray or np.memmap): Dataset of shape (n_samples, n_features)
+    - k (int): Number of clusters the coreset is built for
+    - coreset_size (int, optional): Points to sample (default min(n, 200k))
+    - seed_size (int, optional): Subsample size for the seeding (default
+      max(10000, 20k))
+    - chunk_rows (int): Rows read per chunk in the two streaming passes
+    - sample_weight (np.ndarray, optional): Weight of each point
+    - random_state (int, np.random.Generator, optional): Seed or generator
+
+    Returns:
+    - np.ndarray: Coreset points of shape (coreset_size, n_features)
+    - np.ndarray: Coreset weights of shape (coreset_size,)
+    """
+    n_samples = len(X)
+    rng = _check_random_state(random_state)
+    if coreset_size is None:
+        coreset_size = min(n_samples, 200 * k)
+    if seed_size is None:
+        seed_size = max(10000, 20 * k)
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=np.float64)
+
+    subsample = np.sort(rng.choice(n_samples, min(seed_size, n_samples), replace=False))
+    seeds = initialize_centroids(_as_float_array(X[subsample]), k, random_state=rng,
+                                 init="k-means++")
+
+    cost, cluster_weight = _stream_assign(X, seeds, chunk_rows, sample_weight=sample_weight)
+    # The 1/size terms of a cluster sum to one, and so do all the cost shares
+    total = np.count_nonzero(cluster_weight) + (1.0 if cost > 0 else 0.0)
+
+    points, coreset_weights = [], []
+    remaining, remaining_mass = coreset_size, total
+    for start in range(0, n_samples, chunk_rows):
+        if remaining == 0:
+            break
+        chunk = _as_float_array(X[start:start + chunk_rows], dtype=seeds.dtype)
+        stop = start + len(chunk)
+        weights = np.ones(len(chunk)) if sample_weight is None else sample_weight[start:stop]
+        labels, distances = assign_clusters(chunk, seeds, return_distances=True)
+        size = cluster_weight[labels]
+        sensitivity = np.divide(weights, size, out=np.zeros(len(chunk)), where=size > 0)
+        if cost > 0:
+            sensitivity += weights * distances / cost
+        mass = sensitivity.sum()
+
+        # Chained binomials split the draws over chunks exactly as one
+        # multinomial draw over all rows would
+        if stop == n_samples:
+            n_drawn = remaining
+        else:
+            share = mass / remaining_mass if remaining_mass > 0 else 1.0
+            n_drawn = rng.binomial(remaining, min(1.0, max(0.0, share)))
+        remaining -= n_drawn
+        remaining_mass -= mass
+        if n_drawn and mass > 0:
+            local = np.sort(rng.choice(len(chunk), n_drawn, p=sensitivity / mass))
+            points.append(chunk[local])
+            coreset_weights.append(weights[local] * total / (coreset_size * sensitivity[local]))
+    return np.concatenate(points), np.concatenate(coreset_weights)
+
+def kmeans_coreset(X, k=3, coreset_size=None, compute_labels=False, chunk_rows=65536,
+                   random_state=None, return_info=False, **kmeans_kwargs):
+    """
+    K-means on a sensitivity-sampled coreset of `X` (see `build_coreset`).
+
+    Parameters:
+    - X (np.ndarray or np.memmap): Dataset of shape (n_samples, n_features)
+    - k (int): Number of clusters
+    - coreset_size (int, optional): Coreset points (default min(n, 200k))
+    - compute_labels (bool): Label the full data in a final streaming pass,
+      which also yields the exact full-data inertia; labels are None otherwise
+    - chunk_rows (int): Rows read per chunk in the streaming passes
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    - return_info (bool): Also return a dict with "coreset_size",
+      "coreset_time", "solve_time", "coreset_inertia" (the weighted coreset
+      cost, an estimate of the full inertia) and, with `compute_labels`,
+      "inertia"
+    - **kmeans_kwargs: Passed on to `kmeans` (e.g. init, n_init, algorithm)
+
+    Returns:
+    - tuple: (centroids, labels), or (centroids, labels, info)
+    """
+    rng = _check_random_state(random_state)
+    start = time.perf_counter()
+    points, weights = build_coreset(X, k, coreset_size=coreset_size, chunk_rows=chunk_rows,
+                                    random_state=rng)
+    coreset_time = time.perf_counter() - start
+    centroids, _, solve_info = kmeans(points, k=k, sample_weight=weights, random_state=rng,
+                                      return_info=True, **kmeans_kwargs)
+    info = {
+        "coreset_size": len(points),
+        "coreset_time": coreset_time,
+        "solve_time": time.perf_counter() - start - coreset_time,
+        "coreset_inertia": solve_info["inertia"],
+    }
+
+    labels = None
+    if compute_labels:
+        labels = np.empty(len(X), dtype=np.intp)
+        info["inertia"] = compute_streaming_inertia(X, centroids, chunk_rows=chunk_rows,
+                                                    labels_out=labels)
+    if return_info:
+        return centroids, labels, info
+    return centroids, labels
+
+def compute_cluster_inertia(X, centroids, labels, distances=None, sample_weight=None):
     """
     Compute inertia (within-cluster sum of squares) for a given clustering.
+
+    When the squared distances from `assign_clusters(..., return_distances=True)`
+    are passed in, they are summed directly and no second pass over `X` is made.
     
     Parameters:
     -----------
@@ -77,17 +1583,68 @@ def compute_cluster_inertia(X, centroids, labels):
         Cluster centroids (k, n_features)
     labels : np.ndarray
         Cluster assignments for each point (n_samples,)
+    distances : np.ndarray, optional
+        Squared distance of each point to its assigned centroid (n_samples,)
+    sample_weight : np.ndarray, optional
+        Weight of each point (n_samples,)
     
     Returns:
     --------
     float
-        Total within-cluster sum of squared distances (inertia)
+        Total within-cluster sum of squared distances (inertia), accumulated
+        in float64 whatever the input dtype
     """
-    return np.sum((X - centroids[labels])**2)
+    if distances is None:
+        X = _as_float_array(X)
+        diff = X - np.asarray(centroids, dtype=X.dtype)[labels]
+        if sample_weight is None:
+            return np.einsum("ij,ij->", diff, diff, dtype=np.float64)
+        distances = np.einsum("ij,ij->i", diff, diff)
+    if sample_weight is None:
+        return np.sum(distances, dtype=np.float64)
+    return np.dot(np.asarray(distances, dtype=np.float64), sample_weight)
+
+def _split_worst_cluster(X, centroids):
+    """
+    Returns k+1 centroids: the cluster with the largest inertia is replaced by
+    two centroids placed one standard deviation apart along its principal axis.
+    """
+    labels, distances = assign_clusters(X, centroids, return_distances=True)
+    cluster_inertia = np.bincount(labels, weights=distances, minlength=len(centroids))
+    worst = int(np.argmax(cluster_inertia))
+
+    members = X[labels == worst] - centroids[worst]
+    variances, axes = np.linalg.eigh(members.T @ members / max(1, len(members)))
+    offset = np.sqrt(max(variances[-1], 0.0)) * axes[:, -1]
+
+    split = np.vstack((centroids, centroids[worst] + offset))
+    split[worst] -= offset
+    return split
+
+def _elbow_run(X, k, kmeans_kwargs):
+    start = time.perf_counter()
+    centroids, _, info = kmeans(X, k=k, return_info=True, **kmeans_kwargs)
+    return centroids, info["inertia"], time.perf_counter() - start, info["n_iter"]
 
-def compute_inertia(X, k_range):
+def _elbow_worker(spec, k, kmeans_kwargs):
+    shm, X = _attach_shared(spec)
+    try:
+        return _elbow_run(X, k, kmeans_kwargs)[1:]
+    finally:
+        del X
+        shm.close()
+
+def compute_inertia(X, k_range, n_jobs=None, warm_start=False, init="random",
+                    algorithm="lloyd", max_iters=100, tol=1e-4, random_state=None,
+                    dtype=None, return_info=False):
     """
     Compute inertia for multiple k values (used for Elbow Method).
+
+    With `n_jobs` > 1 the k values run concurrently in a process pool; `X` is
+    placed in shared memory once instead of being pickled for every task.
+    With `warm_start=True` each k is seeded from the (k-1) solution by
+    splitting its highest-inertia cluster, which usually converges in far
+    fewer iterations; the sweep is then sequential by nature.
     
     Parameters:
     -----------
@@ -95,15 +1652,458 @@ def compute_inertia(X, k_range):
         Data points (n_samples, n_features)
     k_range : range or list
         Range of k values to test
+    n_jobs : int, optional
+        Number of worker processes (-1 for all CPUs)
+    warm_start : bool
+        Seed k from the k-1 solution when k-1 was the previous value
+    init, algorithm, max_iters, tol :
+        Passed on to `kmeans`
+    random_state : int or np.random.Generator, optional
+        Seed; each k gets an independent stream
+    dtype : np.dtype, optional
+        Compute dtype, see `kmeans`
+    return_info : bool
+        Also return a dict with per-k "wall_times" (seconds) and "n_iters"
     
     Returns:
     --------
     list
-        List of inertia values for each k
-    """
-    inertias = []
-    for k in k_range:
-        centroids, labels = kmeans(X, k=k)
-        inertia = compute_cluster_inertia(X, centroids, labels)
-        inertias.append(inertia)
-    return inertias
+        List of inertia values for each k, or (inertias, info)
+    """
+    k_range = list(k_range)
+    n_jobs = _effective_n_jobs(n_jobs)
+    if warm_start and n_jobs > 1:
+        raise ValueError("❌ warm_start runs k values sequentially; use n_jobs=1.")
+
+    X = _as_float_array(X, dtype=dtype)
+    kwargs = {"init": init, "algorithm": algorithm, "max_iters": max_iters, "tol": tol}
+    if random_state is None and n_jobs == 1:
+        seeds = [None] * len(k_range)
+    else:
+        seeds = [np.random.default_rng(s) for s in _spawn_seeds(random_state, len(k_range))]
+
+    results = []
+    if n_jobs > 1:
+        shm, spec = _share_array(X)
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                futures = [pool.submit(_elbow_worker, spec, k, dict(kwargs, random_state=seed))
+                           for k, seed in zip(k_range, seeds)]
+                results = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        previous_k, previous_centroids = None, None
+        for k, seed in zip(k_range, seeds):
+            run_kwargs = dict(kwargs, random_state=seed)
+            if warm_start and previous_k == k - 1:
+                run_kwargs["init"] = _split_worst_cluster(X, previous_centroids)
+            centroids, *result = _elbow_run(X, k, run_kwargs)
+            previous_k, previous_centroids = k, centroids
+            results.append(result)
+
+    inertias = [inertia for inertia, _, _ in results]
+    if not return_info:
+        return inertias
+    info = {
+        "wall_times": [wall_time for _, wall_time, _ in results],
+        "n_iters": [n_iter for _, _, n_iter in results],
+    }
+    return inertias, info
+
+
+def _cluster_means(X, labels, k, chunk_rows):
+    """
+    Cluster means and sizes, accumulated chunk by chunk.
+    """
+    sums = np.zeros((k, X.shape[1]), dtype=np.float64)
+    counts = np.zeros(k, dtype=np.float64)
+    for start in range(0, len(X), chunk_rows):
+        chunk = _as_float_array(X[start:start + chunk_rows])
+        chunk_sums, chunk_counts = _cluster_sums(chunk, labels[start:start + len(chunk)], k)
+        sums += chunk_sums
+        counts += chunk_counts
+    return sums / counts[:, np.newaxis], counts
+
+def _silhouette_samples(X, labels, rows, sizes, max_memory_mb):
+    """
+    Silhouette values of X[rows] against the full dataset.
+
+    Points are visited in label-sorted order, one column block at a time, so
+    each block's distances reduce to per-cluster sums with a single
+    ``reduceat``. Half of `max_memory_mb` bounds the gathered column block of
+    `X`, the other half the (row block, column block) distance matrix;
+    only O(n) index and norm arrays are held for the whole dataset.
+    """
+    n_samples, n_features = X.shape
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    x_squared_norms = _squared_norms(X)
+    col_rows = min(n_samples, _block_rows(n_features, X.dtype.itemsize, max_memory_mb / 2))
+    block_rows = _block_rows(col_rows, np.dtype(np.float64).itemsize, max_memory_mb / 2)
+
+    values = np.empty(len(rows), dtype=np.float64)
+    for start in range(0, len(rows), block_rows):
+        block_idx = rows[start:start + block_rows]
+        block = X[block_idx]
+        block_norms = x_squared_norms[block_idx][:, np.newaxis]
+        cluster_sums = np.zeros((len(block_idx), len(sizes)), dtype=np.float64)
+        for col_start in range(0, n_samples, col_rows):
+            cols = order[col_start:col_start + col_rows]
+            col_labels = sorted_labels[col_start:col_start + col_rows]
+            dists = block @ X[cols].T
+            dists *= -2
+            dists += x_squared_norms[cols]
+            dists += block_norms
+            np.maximum(dists, 0, out=dists)
+            np.sqrt(dists, out=dists)
+            # Labels are sorted, so each cluster is one contiguous segment per column block
+            segments = np.flatnonzero(np.concatenate(([True], col_labels[1:] != col_labels[:-1])))
+            cluster_sums[:, col_labels[segments]] += np.add.reduceat(dists, segments, axis=1,
+                                                                     dtype=np.float64)
+
+        own = labels[block_idx]
+        own_sizes = sizes[own]
+        local = np.arange(len(block_idx))
+        a = cluster_sums[local, own] / np.maximum(own_sizes - 1, 1)
+        mean_other = cluster_sums / sizes
+        mean_other[local, own] = np.inf
+        b = mean_other.min(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            s = (b - a) / np.maximum(a, b)
+        # Singleton clusters have a silhouette of 0 by convention
+        values[start:start + len(block_idx)] = np.where(own_sizes > 1, np.nan_to_num(s), 0.0)
+    return values
+
+def silhouette_score(X, labels, sample_size=None, confidence=0.95, max_memory_mb=64,
+                     random_state=None):
+    """
+    Mean silhouette coefficient, computed in memory-bounded blocks.
+
+    The exact score needs every pairwise distance, but only one block of
+    distances and one gathered block of `X` are held at a time, within
+    `max_memory_mb`, plus O(n_samples) labels, sort order and norms. With
+    `sample_size`, a sample stratified by cluster (proportional allocation)
+    is scored against the full data instead, giving an unbiased estimate and
+    a normal confidence interval at O(sample_size · n) cost.
+
+    Parameters:
+    - X (np.ndarray): Dataset of shape (n_samples, n_features)
+    - labels (np.ndarray): Cluster labels of shape (n_samples,)
+    - sample_size (int, optional): Points to score; None scores all of them
+    - confidence (float): Confidence level of the interval in sample mode
+    - max_memory_mb (float): Memory budget for the distance and data blocks
+    - random_state (int, np.random.Generator, optional): Seed or generator
+
+    Returns:
+    - float: Mean silhouette, or (estimate, (low, high)) whenever
+      `sample_size` is given (a zero-width interval when it covers all of `X`)
+    """
+    X = _as_float_array(X)
+    _, labels = np.unique(labels, return_inverse=True)
+    labels = labels.reshape(-1)
+    sizes = np.bincount(labels)
+    if len(sizes) < 2:
+        raise ValueError("❌ Silhouette needs at least 2 clusters.")
+
+    if sample_size is None or sample_size >= len(X):
+        rows = np.arange(len(X))
+        score = float(np.mean(_silhouette_samples(X, labels, rows, sizes, max_memory_mb)))
+        return score if sample_size is None else (score, (score, score))
+
+    rng = _check_random_state(random_state)
+    allocation = np.minimum(sizes, np.maximum(2, np.round(sample_size * sizes / len(X))))
+    allocation = allocation.astype(np.intp)
+    strata = [rng.choice(np.flatnonzero(labels == c), allocation[c], replace=False)
+              for c in range(len(sizes))]
+    rows = np.concatenate(strata)
+    values = _silhouette_samples(X, labels, rows, sizes, max_memory_mb)
+
+    stratum = labels[rows]
+    share = sizes / len(X)
+    means = np.bincount(stratum, weights=values) / allocation
+    squares = np.bincount(stratum, weights=(values - means[stratum]) ** 2)
+    variances = squares / np.maximum(allocation - 1, 1)
+    estimate = float(np.dot(share, means))
+    variance = np.sum(share ** 2 * (1 - allocation / sizes) * variances / allocation)
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * np.sqrt(variance)
+    return estimate, (float(estimate - margin), float(estimate + margin))
+
+def davies_bouldin_score(X, labels, chunk_rows=65536):
+    """
+    Davies–Bouldin index (lower is better), in two chunked passes over `X`.
+
+    Parameters:
+    - X (np.ndarray or np.memmap): Dataset of shape (n_samples, n_features)
+    - labels (np.ndarray): Cluster labels of shape (n_samples,)
+    - chunk_rows (int): Rows read per chunk
+
+    Returns:
+    - float: Mean over clusters of the worst (s_i + s_j) / d(c_i, c_j) ratio
+    """
+    _, labels = np.unique(labels, return_inverse=True)
+    labels = labels.reshape(-1)
+    k = labels.max() + 1
+    if k < 2:
+        raise ValueError("❌ Davies–Bouldin needs at least 2 clusters.")
+    centroids, counts = _cluster_means(X, labels, k, chunk_rows)
+
+    scatter = np.zeros(k, dtype=np.float64)
+    for start in range(0, len(X), chunk_rows):
+        chunk = _as_float_array(X[start:start + chunk_rows])
+        chunk_labels = labels[start:start + len(chunk)]
+        diff = chunk - centroids[chunk_labels]
+        scatter += np.bincount(chunk_labels, weights=np.sqrt(np.einsum("ij,ij->i", diff, diff)),
+                               minlength=k)
+    scatter /= counts
+
+    separation, _ = _half_min_separation(centroids)
+    ratios = (scatter[:, np.newaxis] + scatter) / separation
+    return float(np.mean(ratios.max(axis=1)))
+
+def calinski_harabasz_score(X, labels, chunk_rows=65536):
+    """
+    Calinski–Harabasz index (higher is better), in two chunked passes over `X`.
+
+    Parameters:
+    - X (np.ndarray or np.memmap): Dataset of shape (n_samples, n_features)
+    - labels (np.ndarray): Cluster labels of shape (n_samples,)
+    - chunk_rows (int): Rows read per chunk
+
+    Returns:
+    - float: Between-cluster over within-cluster dispersion, each normalised
+      by its degrees of freedom
+    """
+    _, labels = np.unique(labels, return_inverse=True)
+    labels = labels.reshape(-1)
+    n_samples, k = len(labels), labels.max() + 1
+    if not 1 < k < n_samples:
+        raise ValueError("❌ Calinski–Harabasz needs 2 ≤ number of clusters < n_samples.")
+    centroids, counts = _cluster_means(X, labels, k, chunk_rows)
+    overall = counts @ centroids / n_samples
+
+    within = 0.0
+    for start in range(0, n_samples, chunk_rows):
+        chunk = _as_float_array(X[start:start + chunk_rows])
+        within += compute_cluster_inertia(chunk, centroids, labels[start:start + len(chunk)])
+    between = np.dot(counts, _squared_norms(centroids - overall))
+    if within == 0:
+        return 1.0
+    return float(between * (n_samples - k) / (within * (k - 1)))
+
+class KMeansModel:
+    """
+    Fitted K-means centroids packaged for repeated, low-latency scoring.
+
+    Centroid norms (and -2·Cᵀ) are computed once, and per-thread scratch
+    buffers are reused across `predict` calls so steady-state requests do
+    not allocate (block_rows, k) temporaries. For large k in low dimension
+    a KD-tree over the centroids is used when SciPy (an optional extra, not
+    in requirements.txt) is installed.
+
+    Parameters:
+    - centroids (np.ndarray): Centroids of shape (k, n_features)
+    - tree (str): "auto" (KD-tree when k ≥ 64, n_features ≤ 16 and SciPy is
+      available), "kdtree" or "none"
+    - block_rows (int): Rows scored per block by the matmul search
+    """
+
+    VERSION = 1
+
+    def __init__(self, centroids, tree="auto", block_rows=1024):
+        if tree not in ("auto", "kdtree", "none"):
+            raise ValueError(f"❌ Unknown tree '{tree}'. Use 'auto', 'kdtree' or 'none'.")
+        if tree == "kdtree" and cKDTree is None:
+            raise ImportError("❌ tree='kdtree' requires SciPy (pip install scipy).")
+
+        self.centroids = np.ascontiguousarray(_as_float_array(centroids))
+        self.block_rows = block_rows
+        self._centroid_squared_norms = _squared_norms(self.centroids)
+        self._neg2_centroids_t = np.ascontiguousarray(-2 * self.centroids.T)
+        self._scratch = threading.local()
+
+        k, n_features = self.centroids.shape
+        use_tree = tree == "kdtree" or (
+            tree == "auto" and cKDTree is not None and k >= 64 and n_features <= 16
+        )
+        self._tree = cKDTree(self.centroids) if use_tree else None
+
+    @classmethod
+    def fit(cls, X, k=3, tree="auto", block_rows=1024, **kmeans_kwargs):
+        """
+        Runs `kmeans` on `X` and wraps the resulting centroids.
+        """
+        centroids, _ = kmeans(X, k=k, **kmeans_kwargs)
+        return cls(centroids, tree=tree, block_rows=block_rows)
+
+    @property
+    def n_clusters(self):
+        return len(self.centroids)
+
+    def _buffer(self, rows):
+        buffer = getattr(self._scratch, "buffer", None)
+        if buffer is None or len(buffer) < rows:
+            buffer = np.empty((rows, self.n_clusters), dtype=self.centroids.dtype)
+            self._scratch.buffer = buffer
+        return buffer[:rows]
+
+    def predict(self, X, return_distances=False):
+        """
+        Index of the nearest centroid for every row of `X`.
+
+        Parameters:
+        - X (np.ndarray): Batch of shape (n_samples, n_features)
+        - return_distances (bool): Also return squared distances to that centroid
+
+        Returns:
+        - np.ndarray: Labels of shape (n_samples,), plus distances when requested
+        """
+        X = np.asarray(X, dtype=self.centroids.dtype)
+        if self._tree is not None:
+            distances, labels = self._tree.query(X)
+            labels = labels.astype(np.intp, copy=False)
+            if return_distances:
+                return labels, (distances ** 2).astype(X.dtype, copy=False)
+            return labels
+
+        n_samples = len(X)
+        labels = np.empty(n_samples, dtype=np.intp)
+        distances = np.empty(n_samples, dtype=X.dtype) if return_distances else None
+        block_rows = max(1, min(self.block_rows, n_samples))
+        for start in range(0, n_samples, block_rows):
+            stop = min(start + block_rows, n_samples)
+            block = self._buffer(stop - start)
+            np.matmul(X[start:stop], self._neg2_centroids_t, out=block)
+            block += self._centroid_squared_norms
+            np.argmin(block, axis=1, out=labels[start:stop])
+            if return_distances:
+                best = block[np.arange(stop - start), labels[start:stop]]
+                best += _squared_norms(X[start:stop])
+                np.maximum(best, 0, out=distances[start:stop])
+        if return_distances:
+            return labels, distances
+        return labels
+
+    def transform(self, X, out=None):
+        """
+        Euclidean distance from every row of `X` to every centroid.
+
+        Parameters:
+        - X (np.ndarray): Batch of shape (n_samples, n_features)
+        - out (np.ndarray, optional): Preallocated (n_samples, k) result array
+
+        Returns:
+        - np.ndarray: Distances of shape (n_samples, k)
+        """
+        X = np.asarray(X, dtype=self.centroids.dtype)
+        if out is None:
+            out = np.empty((len(X), self.n_clusters), dtype=X.dtype)
+        np.matmul(X, self._neg2_centroids_t, out=out)
+        out += self._centroid_squared_norms
+        out += _squared_norms(X)[:, np.newaxis]
+        np.maximum(out, 0, out=out)
+        return np.sqrt(out, out=out)
+
+    def save(self, path):
+        """
+        Saves the model to a single .npz file.
+        """
+        save_npz(path, centroids=self.centroids, version=np.array(self.VERSION),
+                 tree=np.array("kdtree" if self._tree is not None else "none"),
+                 block_rows=np.array(self.block_rows))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a model written by `save`.
+        """
+        with load_npz(path) as data:
+            version = int(data["version"])
+            if version > cls.VERSION:
+                raise ValueError(f"❌ Unsupported KMeansModel file version {version}.")
+            tree = str(data["tree"])
+            if tree == "kdtree" and cKDTree is None:
+                tree = "none"
+            return cls(data["centroids"], tree=tree, block_rows=int(data["block_rows"]))
+
+
+class OnlineKMeans:
+    """
+    Incremental K-means for continuously arriving data.
+
+    Each `partial_fit` call assigns the batch with `assign_clusters` and
+    folds its per-cluster sums into running centroid means, so an update
+    costs O(batch) regardless of how much data has been seen. With
+    `decay` < 1 the running counts are multiplied by `decay` before every
+    batch, exponentially forgetting old data so centroids can track drift.
+
+    Parameters:
+    - k (int): Number of clusters
+    - decay (float): Weight kept by past data per batch, in (0, 1]
+    - init (str): Seeding strategy for the first `k` rows, see `initialize_centroids`
+    - random_state (int, np.random.Generator, optional): Seed or generator
+    """
+
+    def __init__(self, k=3, decay=1.0, init="k-means++", random_state=None):
+        if not 0 < decay <= 1:
+            raise ValueError(f"❌ decay must be in (0, 1], got {decay}.")
+        self.k = k
+        self.decay = decay
+        self.init = init
+        self.random_state = random_state
+        self.centroids = None
+        self.counts = np.zeros(k, dtype=np.float64)
+        self.n_seen = 0
+        self._pending = []
+
+    def partial_fit(self, batch, sample_weight=None):
+        """
+        Updates the centroids with one batch of shape (n_samples, n_features).
+
+        Rows are buffered until at least `k` have arrived to seed the centroids.
+        """
+        batch = _as_float_array(batch)
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+
+        if self.centroids is None:
+            self._pending.append((batch, sample_weight))
+            if sum(len(rows) for rows, _ in self._pending) < self.k:
+                return self
+            batch = np.vstack([rows for rows, _ in self._pending])
+            if any(weights is not None for _, weights in self._pending):
+                sample_weight = np.concatenate([
+                    np.ones(len(rows)) if weights is None else weights
+                    for rows, weights in self._pending
+                ])
+            self._pending = []
+            self.centroids = initialize_centroids(batch, self.k, init=self.init,
+                                                  random_state=self.random_state)
+
+        labels = assign_clusters(batch, self.centroids)
+        sums, batch_counts = _cluster_sums(batch, labels, self.k, sample_weight=sample_weight)
+
+        self.counts *= self.decay
+        hit = batch_counts > 0
+        previous = self.counts[hit, np.newaxis] * self.centroids[hit]
+        self.counts[hit] += batch_counts[hit]
+        self.centroids[hit] = (previous + sums[hit]) / self.counts[hit, np.newaxis]
+        self.n_seen += len(batch)
+        return self
+
+    def predict(self, X):
+        """
+        Index of the nearest current centroid for every row of `X`.
+        """
+        if self.centroids is None:
+            raise ValueError("❌ OnlineKMeans has not seen enough data to predict yet.")
+        return assign_clusters(X, self.centroids)
+
+    def to_model(self, **model_kwargs):
+        """
+        Snapshot of the current centroids as a `KMeansModel` for scoring.
+        """
+        if self.centroids is None:
+            raise ValueError("❌ OnlineKMeans has not seen enough data to build a model yet.")
+        return KMeansModel(self.centroids.copy(), **model_kwargs)
@@ -0,0 +1,140 @@
+"""
+Unit tests for chunked_store module
+"""
+import tracemalloc
+import pytest
+import numpy as np
+from scripts.chunked_store import (
+    ChunkedArray,
+    save_chunked,
+    open_chunked,
+    load_chunked,
+)
+
+
+@pytest.fixture
+def data():
+    """Fixture providing a 3D float array"""
+    return np.random.default_rng(0).standard_normal((500, 4, 3))
+
+
+class TestSaveChunked:
+    """Tests for save_chunked / load_chunked round trips"""
+    
+    @pytest.mark.parametrize("codec", ["zlib", "lzma", "none"])
+    def test_roundtrip(self, tmp_path, data, codec):
+        path = tmp_path / "store.npc"
+        n_chunks = save_chunked(path, data, chunk_rows=64, codec=codec, n_jobs=2)
+        assert n_chunks == 8
+        loaded = load_chunked(path, n_jobs=2)
+        assert loaded.dtype == data.dtype
+        assert np.array_equal(loaded, data)
+    
+    def test_compresses(self, tmp_path):
+        data = np.zeros((10000, 8))
+        save_chunked(tmp_path / "z.npc", data)
+        assert (tmp_path / "z.npc").stat().st_size < data.nbytes // 10
+    
+    def test_from_memmap(self, tmp_path):
+        mmap = np.memmap(tmp_path / "raw.dat", dtype=np.int32, mode="w+", shape=(100, 5))
+        mmap[:] = np.arange(500).reshape(100, 5)
+        save_chunked(tmp_path / "m.npc", mmap, chunk_rows=7)
+        assert np.array_equal(load_chunked(tmp_path / "m.npc"), mmap)
+    
+    def test_structured_and_empty(self, tmp_path):
+        dtype = np.dtype([("a", "<f4"), ("b", "<i8", (2,))])
+        records = np.zeros(10, dtype=dtype)
+        records["a"] = np.arange(10)
+        save_chunked(tmp_path / "s.npc", records, chunk_rows=3)
+        assert np.array_equal(load_chunked(tmp_path / "s.npc"), records)
+        save_chunked(tmp_path / "e.npc", np.empty((0, 3)))
+        assert load_chunked(tmp_path / "e.npc").shape == (0, 3)
+    
+    def test_invalid_arguments(self, tmp_path):
+        with pytest.raises(ValueError):
+            save_chunked(tmp_path / "x.npc", np.ones(3), codec="snappy")
+        with pytest.raises(ValueError):
+            save_chunked(tmp_path / "x.npc", np.float64(1.0))
+
+
+class TestChunkedArray:
+    """Tests for lazy slicing of a chunked store"""
+    
+    @pytest.mark.parametrize("key", [
+        np.s_[10:200, 3],
+        np.s_[-1],
+        np.s_[::-7],
+        np.s_[[5, 499, 5]],
+        np.s_[..., 1],
+        np.s_[5, 2, 1],
+        np.s_[40:50, :, ::2],
+        np.s_[480:3:-13],
+        np.s_[::100],
+        np.s_[7:7],
+        np.s_[[-1, 0, 499]],
+    ])
+    def test_indexing_matches_numpy(self, tmp_path, data, key):
+        save_chunked(tmp_path / "store.npc", data, chunk_rows=32)
+        with open_chunked(tmp_path / "store.npc", n_jobs=4) as store:
+            assert np.array_equal(store[key], data[key])
+    
+    def test_only_touched_chunks_read(self, tmp_path, data, monkeypatch):
+        save_chunked(tmp_path / "store.npc", data, chunk_rows=32)
+        store = open_chunked(tmp_path / "store.npc")
+        seen = []
+        read_chunk = store.read_chunk
+        monkeypatch.setattr(store, "read_chunk", lambda i: seen.append(i) or read_chunk(i))
+        store[70:100]
+        assert sorted(seen) == [2, 3]
+        store.close()
+    
+    def test_boolean_index_and_bounds(self, tmp_path, data):
+        save_chunked(tmp_path / "store.npc", data, chunk_rows=32)
+        mask = data[:, 0, 0] > 0
+        with open_chunked(tmp_path / "store.npc") as store:
+            assert np.array_equal(store[mask], data[mask])
+            for bad in (500, -501, [0, 500]):
+                with pytest.raises(IndexError):
+                    store[bad]
+    
+    def test_small_read_memory_is_independent_of_store_size(self, tmp_path):
+        save_chunked(tmp_path / "big.npc", np.zeros(2_000_000, dtype=np.int8), chunk_rows=4096)
+        with open_chunked(tmp_path / "big.npc") as store:
+            store[:5]
+            tracemalloc.start()
+            try:
+                rows = store[1_500_000:1_500_005]
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        assert rows.shape == (5,)
+        assert peak < 1 << 20
+    
+    def test_reuses_thread_pool(self, tmp_path, data):
+        save_chunked(tmp_path / "store.npc", data, chunk_rows=32)
+        with open_chunked(tmp_path / "store.npc") as store:
+            assert store.n_jobs > 1
+            store[:100]
+            pool = store._pool
+            assert pool is not None
+            store[200:400]
+            assert store._pool is pool
+        assert store._pool is None
+    
+    def test_metadata(self, tmp_path, data):
+        save_chunked(tmp_path / "store.npc", data.astype(np.float32), chunk_rows=100)
+        with open_chunked(tmp_path / "store.npc") as store:
+            assert isinstance(store, ChunkedArray)
+            assert store.shape == (500, 4, 3) and len(store) == 500 and store.ndim == 3
+            assert store.dtype == np.float32 and store.n_chunks == 5
+            assert np.asarray(store).shape == (500, 4, 3)
+    
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "bad.npc"
+        path.write_bytes(b"not a store at all, just some bytes")
+        with pytest.raises(ValueError):
+            open_chunked(path)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
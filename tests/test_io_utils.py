@@ -0,0 +1,445 @@
+"""
+Unit tests for io_utils module
+"""
+import os
+import zipfile
+import pytest
+import numpy as np
+from scripts.io_utils import (
+    iter_csv_chunks,
+    create_memmap,
+    load_memmap,
+    read_memmap_meta,
+    append_memmap_rows,
+    map_blocks,
+    load_npz,
+    load_npz_lazy,
+    save_npz_aligned,
+    load_npy,
+    NpyAppendWriter,
+    load_csv_cached,
+    clear_csv_cache,
+    iter_batches,
+)
+from scripts.chunked_store import save_chunked
+from scripts.math_utils import sqrt_array
+from scripts.stats_utils import summarize_array
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Fixture writing a 10x3 CSV with one empty field"""
+    rows = [[i, i + 0.5, -i] for i in range(10)]
+    lines = [", ".join(str(v) for v in row) for row in rows]
+    lines[4] = "4, , -4"
+    path = tmp_path / "data.csv"
+    path.write_text("a, b, c\n" + "\n".join(lines) + "\n")
+    return path
+
+
+class TestIterCsvChunks:
+    """Tests for iter_csv_chunks function"""
+    
+    def test_block_sizes(self, csv_path):
+        blocks = list(iter_csv_chunks(csv_path, chunk_rows=4, skip_header=1))
+        assert [len(b) for b in blocks] == [4, 4, 2]
+        assert all(b.shape[1] == 3 for b in blocks)
+    
+    def test_missing_as_nan(self, csv_path):
+        data = np.concatenate(list(iter_csv_chunks(csv_path, chunk_rows=3, skip_header=1)))
+        assert np.isnan(data[4, 1])
+        assert np.isnan(data).sum() == 1
+        assert np.array_equal(data[:, 0], np.arange(10))
+    
+    def test_missing_as_mask(self, csv_path):
+        blocks = list(iter_csv_chunks(csv_path, chunk_rows=3, skip_header=1, missing="mask",
+                                      filling_value=-1))
+        assert all(isinstance(b, np.ma.MaskedArray) for b in blocks)
+        data = np.ma.concatenate(blocks)
+        assert data.mask.sum() == 1 and data.mask[4, 1]
+        assert data.data[4, 1] == -1
+    
+    def test_matches_loadtxt(self, tmp_path):
+        X = np.random.default_rng(0).standard_normal((500, 6))
+        path = tmp_path / "big.csv"
+        np.savetxt(path, X, delimiter=",")
+        data = np.concatenate(list(iter_csv_chunks(path, chunk_rows=64, dtype=np.float32)))
+        assert data.dtype == np.float32
+        assert np.array_equal(data, np.loadtxt(path, delimiter=",", dtype=np.float32))
+    
+    def test_threads_keep_order(self, tmp_path):
+        X = np.arange(3000, dtype=float).reshape(1000, 3)
+        path = tmp_path / "seq.csv"
+        np.savetxt(path, X, delimiter=",")
+        data = np.concatenate(list(iter_csv_chunks(path, chunk_rows=50, n_jobs=4)))
+        assert np.array_equal(data, X)
+    
+    def test_single_character_fields(self, tmp_path):
+        path = tmp_path / "short.csv"
+        path.write_text("1,,3\n4,5,6\n")
+        data = next(iter_csv_chunks(path))
+        assert np.isnan(data[0, 1])
+        assert np.array_equal(data[1], [4, 5, 6])
+        masked = next(iter_csv_chunks(path, dtype=np.int64, missing="mask"))
+        assert masked.mask[0, 1] and masked[1, 2] == 6
+    
+    def test_ragged_rows_raise(self, tmp_path):
+        path = tmp_path / "ragged.csv"
+        path.write_text("10.0,,30.0\n4.0,5.0\n6.0,7.0,8.0,9.0\n")
+        with pytest.raises(ValueError):
+            list(iter_csv_chunks(path))
+    
+    def test_inconsistent_rows_raise(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("1,2,3\n4,5\n")
+        with pytest.raises(ValueError):
+            list(iter_csv_chunks(path))
+    
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_column_change_across_blocks_raises(self, tmp_path, n_jobs):
+        path = tmp_path / "widening.csv"
+        path.write_text("1,2\n3,4\n5,6,7\n8,9,10\n")
+        with pytest.raises(ValueError):
+            list(iter_csv_chunks(path, chunk_rows=2, n_jobs=n_jobs))
+    
+    def test_blank_blocks_are_skipped(self, tmp_path):
+        path = tmp_path / "gaps.csv"
+        path.write_text("1,2\n\n\n\n\n3,4\n")
+        blocks = list(iter_csv_chunks(path, chunk_rows=2))
+        assert [block.shape for block in blocks] == [(1, 2), (1, 2)]
+        
+        cached = load_csv_cached(path, cache_dir=tmp_path / "cache")
+        assert np.array_equal(cached, [[1, 2], [3, 4]])
+    
+    def test_nan_mode_needs_float(self, csv_path):
+        with pytest.raises(ValueError):
+            next(iter_csv_chunks(csv_path, dtype=np.int64))
+
+
+class TestSelfDescribingMemmap:
+    """Tests for create_memmap / load_memmap / append_memmap_rows"""
+    
+    def test_roundtrip_without_shape(self, tmp_path):
+        path = tmp_path / "arr.dat"
+        created = create_memmap(path, shape=(5, 4), dtype=np.float64)
+        expected = np.array(created)
+        del created
+        loaded = load_memmap(path)
+        assert isinstance(loaded, np.memmap)
+        assert loaded.shape == (5, 4) and loaded.dtype == np.float64
+        assert np.array_equal(loaded, expected)
+    
+    def test_meta_contents(self, tmp_path):
+        path = tmp_path / "arr.dat"
+        create_memmap(path, shape=(2, 3), dtype="int32", order="F")
+        meta = read_memmap_meta(path)
+        assert meta["shape"] == (2, 3)
+        assert meta["dtype"] == np.int32
+        assert meta["order"] == "F"
+        assert load_memmap(path).flags.f_contiguous
+    
+    def test_mismatch_raises(self, tmp_path):
+        path = tmp_path / "arr.dat"
+        create_memmap(path, shape=(3, 3))
+        with pytest.raises(ValueError):
+            load_memmap(path, shape=(4, 4))
+        with pytest.raises(ValueError):
+            load_memmap(path, dtype=np.float64)
+    
+    def test_raw_file_needs_shape(self, tmp_path):
+        path = tmp_path / "raw.dat"
+        np.arange(6, dtype=np.int16).tofile(path)
+        with pytest.raises(ValueError):
+            load_memmap(path)
+        with pytest.raises(ValueError):
+            load_memmap(path, shape=(4, 2), dtype=np.int16)
+        assert np.array_equal(load_memmap(path, shape=(2, 3), dtype=np.int16),
+                              np.arange(6).reshape(2, 3))
+    
+    def test_append_rows(self, tmp_path):
+        path = tmp_path / "grow.dat"
+        create_memmap(path, shape=(0, 3), dtype=np.float32)
+        assert load_memmap(path).shape == (0, 3)
+        append_memmap_rows(path, np.ones((2, 3)))
+        grown = append_memmap_rows(path, [7, 8, 9])
+        assert grown.shape == (3, 3) and grown.dtype == np.float32
+        assert np.array_equal(load_memmap(path)[2], [7, 8, 9])
+        with pytest.raises(ValueError):
+            append_memmap_rows(path, np.ones((1, 2)))
+    
+    def test_append_rejects_fortran(self, tmp_path):
+        path = tmp_path / "f.dat"
+        create_memmap(path, shape=(2, 2), order="F")
+        with pytest.raises(ValueError):
+            append_memmap_rows(path, np.ones((1, 2)))
+
+
+class TestMapBlocks:
+    """Tests for chunked create_memmap fill and map_blocks"""
+    
+    def test_chunked_fill_matches_single_draw(self, tmp_path):
+        np.random.seed(3)
+        expected = np.random.rand(10, 4)
+        np.random.seed(3)
+        mmap = create_memmap(tmp_path / "a.dat", shape=(10, 4), dtype=np.float64, block_rows=3)
+        assert np.array_equal(mmap, expected)
+    
+    @pytest.mark.parametrize("prefetch", [False, True])
+    def test_elementwise_to_memmap(self, tmp_path, prefetch):
+        src = create_memmap(tmp_path / "in.dat", shape=(103, 5), dtype=np.float64)
+        dst = create_memmap(tmp_path / "out.dat", shape=(103, 5), dtype=np.float64)
+        out = map_blocks(src, sqrt_array, dst, block_rows=10, prefetch=prefetch)
+        assert out is dst
+        assert np.allclose(load_memmap(tmp_path / "out.dat"), np.sqrt(src))
+    
+    def test_reduction_returns_blocks(self):
+        data = np.arange(25, dtype=float).reshape(5, 5)
+        summaries = map_blocks(data, summarize_array, block_rows=2, prefetch=True)
+        assert len(summaries) == 3
+        assert summaries[-1]["max"] == 24
+    
+    def test_row_mismatch_raises(self):
+        data = np.ones((6, 2))
+        with pytest.raises(ValueError):
+            map_blocks(data, lambda b: b.sum(axis=0), np.empty((6, 2)), block_rows=3)
+        with pytest.raises(ValueError):
+            map_blocks(data, np.sqrt, np.empty((5, 2)))
+
+
+class TestLazyNpz:
+    """Tests for load_npz_lazy and save_npz_aligned"""
+    
+    @pytest.fixture
+    def arrays(self):
+        return {
+            "a": np.arange(12.0).reshape(3, 4),
+            "b": np.asfortranarray(np.ones((5, 3), dtype=np.int16)),
+            "c": np.array([1, 2, 3], dtype=np.uint8),
+            "empty": np.empty((0, 2)),
+        }
+    
+    def test_aligned_members_are_memmapped(self, tmp_path, arrays):
+        path = tmp_path / "bundle.npz"
+        save_npz_aligned(path, **arrays)
+        with load_npz_lazy(path) as bundle:
+            assert sorted(bundle.keys()) == sorted(arrays)
+            for name, arr in arrays.items():
+                info = bundle.info(name)
+                assert info["stored"] and info["aligned"]
+                assert np.array_equal(bundle[name], arr)
+            assert isinstance(bundle["a"], np.memmap)
+            assert bundle["b"].flags.f_contiguous
+            assert bundle["a"] is bundle["a.npy"]
+    
+    @pytest.mark.parametrize("align", [1, 2, 4, 8])
+    def test_small_alignments(self, tmp_path, arrays, align):
+        path = tmp_path / "bundle.npz"
+        save_npz_aligned(path, align=align, **arrays)
+        with load_npz_lazy(path) as bundle:
+            for name, arr in arrays.items():
+                assert bundle.info(name)["offset"] % align == 0
+                assert np.array_equal(bundle[name], arr)
+    
+    def test_readable_by_np_load(self, tmp_path, arrays):
+        path = tmp_path / "bundle.npz"
+        save_npz_aligned(path, **arrays)
+        loaded = load_npz(path)
+        for name, arr in arrays.items():
+            assert np.array_equal(loaded[name], arr)
+    
+    def test_zip64_headers_stay_aligned(self, tmp_path, arrays, monkeypatch):
+        monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 64)
+        path = tmp_path / "bundle64.npz"
+        save_npz_aligned(path, **arrays)
+        with load_npz_lazy(path) as bundle:
+            assert all(bundle.info(name)["aligned"] for name in arrays)
+            assert np.array_equal(bundle["a"], arrays["a"])
+    
+    def test_plain_and_compressed_npz(self, tmp_path, arrays):
+        np.savez(tmp_path / "plain.npz", **arrays)
+        np.savez_compressed(tmp_path / "packed.npz", **arrays)
+        with load_npz_lazy(tmp_path / "plain.npz") as plain:
+            assert isinstance(plain["a"], np.memmap)
+            assert np.array_equal(plain["c"], arrays["c"])
+        with load_npz_lazy(tmp_path / "packed.npz") as packed:
+            assert not packed.info("a")["stored"]
+            assert not isinstance(packed["a"], np.memmap)
+            assert np.array_equal(packed["b"], arrays["b"])
+    
+    def test_missing_member(self, tmp_path, arrays):
+        save_npz_aligned(tmp_path / "bundle.npz", **arrays)
+        with load_npz_lazy(tmp_path / "bundle.npz") as bundle:
+            assert "zz" not in bundle
+            with pytest.raises(KeyError):
+                bundle["zz"]
+
+
+class TestNpyAppendWriter:
+    """Tests for NpyAppendWriter"""
+    
+    def test_blocks_and_single_rows(self, tmp_path):
+        path = tmp_path / "out.npy"
+        with NpyAppendWriter(path, dtype=np.float32, row_shape=(2,)) as writer:
+            for i in range(4):
+                writer.append(np.full((3, 2), i))
+            writer.append([9, 9])
+            assert writer.shape == (13, 2)
+        data = load_npy(path)
+        assert data.shape == (13, 2) and data.dtype == np.float32
+        assert np.array_equal(data[-1], [9, 9])
+        assert np.array_equal(data[:12:3, 0], np.arange(4))
+    
+    def test_infers_layout_and_memmaps(self, tmp_path):
+        path = tmp_path / "out.npy"
+        with NpyAppendWriter(path) as writer:
+            writer.append(np.arange(6, dtype=np.int16).reshape(2, 3))
+            writer.append(np.arange(3, dtype=np.int16))
+        data = np.load(path, mmap_mode="r")
+        assert isinstance(data, np.memmap)
+        assert data.shape == (3, 3) and data.dtype == np.int16
+    
+    def test_header_is_64_byte_aligned(self, tmp_path):
+        path = tmp_path / "out.npy"
+        with NpyAppendWriter(path, dtype=np.float64, row_shape=(4,)) as writer:
+            writer.append(np.ones((5, 4)))
+        assert (path.stat().st_size - 5 * 4 * 8) % 64 == 0
+    
+    def test_empty_and_structured(self, tmp_path):
+        with NpyAppendWriter(tmp_path / "empty.npy", dtype="i4", row_shape=(3,)):
+            pass
+        assert np.load(tmp_path / "empty.npy").shape == (0, 3)
+        dtype = np.dtype([("x", "f4"), ("y", "i2")])
+        records = np.zeros(4, dtype=dtype)
+        records["y"] = [1, 2, 3, 4]
+        with NpyAppendWriter(tmp_path / "rec.npy", dtype=dtype) as writer:
+            writer.append(records)
+        assert np.array_equal(np.load(tmp_path / "rec.npy"), records)
+        stamps = np.array(["2024-01-01T00:00", "2024-06-30T12:30"], dtype="datetime64[m]")
+        with NpyAppendWriter(tmp_path / "dates.npy") as writer:
+            writer.append(stamps)
+            writer.append(stamps + np.timedelta64(1, "D"))
+        assert np.array_equal(np.load(tmp_path / "dates.npy"),
+                              np.concatenate([stamps, stamps + np.timedelta64(1, "D")]))
+    
+    def test_rejects_bad_rows_and_closed_writer(self, tmp_path):
+        writer = NpyAppendWriter(tmp_path / "out.npy", row_shape=(2,))
+        with pytest.raises(ValueError):
+            writer.append(np.ones((2, 3)))
+        writer.close()
+        with pytest.raises(ValueError):
+            writer.append(np.ones(2))
+
+
+class TestCsvCache:
+    """Tests for load_csv_cached"""
+    
+    @staticmethod
+    def _entries(cache_dir):
+        return sorted(name for name in os.listdir(cache_dir) if not name.startswith("."))
+    
+    def test_hit_is_memmapped(self, tmp_path, csv_path):
+        cache = tmp_path / "cache"
+        first = load_csv_cached(csv_path, skip_header=1, cache_dir=cache)
+        assert len(self._entries(cache)) == 1
+        second = load_csv_cached(csv_path, skip_header=1, cache_dir=cache)
+        assert isinstance(second, np.memmap)
+        assert np.array_equal(first, second, equal_nan=True)
+        assert np.isnan(second[4, 1]) and second.shape == (10, 3)
+    
+    def test_hit_does_not_reparse(self, tmp_path, csv_path, monkeypatch):
+        cache = tmp_path / "cache"
+        load_csv_cached(csv_path, skip_header=1, cache_dir=cache)
+        import scripts.io_utils as io_utils
+        monkeypatch.setattr(io_utils, "iter_csv_chunks", None)
+        assert load_csv_cached(csv_path, skip_header=1, cache_dir=cache).shape == (10, 3)
+    
+    def test_mask_mode(self, tmp_path, csv_path):
+        cache = tmp_path / "cache"
+        for _ in range(2):
+            data = load_csv_cached(csv_path, skip_header=1, missing="mask", cache_dir=cache)
+            assert isinstance(data, np.ma.MaskedArray)
+            assert data.mask.sum() == 1 and data.mask[4, 1]
+        assert len(self._entries(cache)) == 2
+    
+    def test_modified_file_replaces_stale_entry(self, tmp_path, csv_path):
+        cache = tmp_path / "cache"
+        load_csv_cached(csv_path, skip_header=1, cache_dir=cache)
+        old = self._entries(cache)
+        csv_path.write_text("1, 2\n3, 4\n")
+        data = load_csv_cached(csv_path, cache_dir=cache)
+        assert np.array_equal(data, [[1, 2], [3, 4]])
+        new = self._entries(cache)
+        assert len(new) == 1 and new != old
+    
+    def test_lru_eviction(self, tmp_path):
+        cache = tmp_path / "cache"
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"f{i}.csv"
+            np.savetxt(path, np.full((200, 4), i), delimiter=",")
+            paths.append(path)
+        load_csv_cached(paths[0], cache_dir=cache)
+        (first,) = self._entries(cache)
+        load_csv_cached(paths[1], cache_dir=cache)
+        (second,) = set(self._entries(cache)) - {first}
+        entry_size = os.path.getsize(cache / first)
+        os.utime(cache / first, ns=(0, 0))
+        os.utime(cache / second, ns=(0, 0))
+        load_csv_cached(paths[1], cache_dir=cache)  # hit refreshes the second entry
+        load_csv_cached(paths[2], cache_dir=cache, max_cache_bytes=2 * entry_size)
+        entries = self._entries(cache)
+        assert len(entries) == 2 and second in entries and first not in entries
+        clear_csv_cache(cache)
+        assert self._entries(cache) == []
+
+
+class TestIterBatches:
+    """Tests for iter_batches"""
+    
+    @pytest.fixture
+    def data(self):
+        return np.arange(1003 * 3, dtype=np.float64).reshape(1003, 3)
+    
+    @pytest.mark.parametrize("kind", ["array", "npy", "memmap", "chunked"])
+    def test_sources_roundtrip(self, tmp_path, data, kind):
+        if kind == "array":
+            source = data
+        elif kind == "npy":
+            source = tmp_path / "x.npy"
+            np.save(source, data)
+        elif kind == "memmap":
+            source = tmp_path / "x.dat"
+            create_memmap(source, shape=data.shape, dtype=data.dtype)[:] = data
+        else:
+            source = tmp_path / "x.npc"
+            save_chunked(source, data, chunk_rows=100)
+        batches = [b.copy() for b in iter_batches(source, batch_size=128, prefetch=3, n_jobs=2)]
+        assert [len(b) for b in batches] == [128] * 7 + [107]
+        assert np.array_equal(np.concatenate(batches), data)
+    
+    def test_shuffle_blocks(self, data):
+        batches = [b.copy() for b in iter_batches(data, batch_size=50, shuffle_blocks=True,
+                                                  block_rows=200, random_state=0)]
+        rows = np.concatenate(batches)[:, 0] // 3
+        assert np.array_equal(np.sort(rows), np.arange(1003))
+        assert not np.array_equal(rows, np.arange(1003))
+        assert all(np.all(np.diff(b[:, 0]) == 3) for b in batches)
+    
+    def test_buffers_are_reused(self, data):
+        buffers = {b.ctypes.data for b in iter_batches(data, batch_size=100, prefetch=2)}
+        assert len(buffers) == 3
+        fresh = [b for b in iter_batches(data, batch_size=100, reuse_buffers=False)]
+        assert np.array_equal(np.concatenate(fresh), data)
+    
+    def test_dtype_and_drop_last(self, data):
+        batches = list(iter_batches(data, batch_size=128, dtype=np.float32, drop_last=True))
+        assert len(batches) == 7
+        assert all(b.dtype == np.float32 and len(b) == 128 for b in batches)
+    
+    def test_invalid_arguments(self, data):
+        with pytest.raises(ValueError):
+            next(iter_batches(data, batch_size=0))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
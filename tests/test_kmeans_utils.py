@@ -1,16 +1,33 @@
 """
 Unit tests for kmeans_utils module
 """
+import multiprocessing
+import os
+import tracemalloc
 import pytest
 import numpy as np
 from scripts.kmeans_utils import (
     generate_data,
+    make_blobs,
     initialize_centroids,
     assign_clusters,
     update_centroids,
     kmeans,
+    minibatch_kmeans,
+    kmeans_memmap,
+    kmeans_data_parallel,
+    KMeansModel,
+    KMeansTrace,
+    OnlineKMeans,
     compute_inertia,
     compute_cluster_inertia,
+    compress_duplicates,
+    build_coreset,
+    kmeans_coreset,
+    compute_streaming_inertia,
+    silhouette_score,
+    davies_bouldin_score,
+    calinski_harabasz_score,
 )
 
 
@@ -25,6 +42,73 @@ class TestGenerateData:
         data = generate_data()
         assert isinstance(data, np.ndarray)
         assert data.dtype == np.float64
+    
+    def test_data_float32(self):
+        assert generate_data(dtype=np.float32).dtype == np.float32
+    
+    def test_global_random_state_untouched(self):
+        np.random.seed(0)
+        expected = np.random.rand()
+        np.random.seed(0)
+        generate_data()
+        assert np.random.rand() == expected
+
+
+class TestMakeBlobs:
+    """Tests for make_blobs function"""
+    
+    def test_shape_and_dtype(self):
+        data, labels = make_blobs(n_samples=1000, n_features=5, k=4, dtype=np.float32,
+                                  random_state=0)
+        assert data.shape == (1000, 5)
+        assert data.dtype == np.float32
+        assert set(np.unique(labels)) <= {0, 1, 2, 3}
+    
+    def test_independent_of_n_jobs(self):
+        serial, labels = make_blobs(n_samples=1000, chunk_rows=128, random_state=3)
+        threaded, threaded_labels = make_blobs(n_samples=1000, chunk_rows=128,
+                                               random_state=3, n_jobs=4)
+        assert np.array_equal(serial, threaded)
+        assert np.array_equal(labels, threaded_labels)
+    
+    def test_cluster_spread(self):
+        centers = np.array([[0.0, 0.0], [100.0, 100.0]])
+        data, labels = make_blobs(n_samples=4000, centers=centers, cluster_std=[1.0, 3.0],
+                                  random_state=0)
+        assert np.allclose(data[labels == 0].std(axis=0), 1.0, atol=0.1)
+        assert np.allclose(data[labels == 1].mean(axis=0), [100, 100], atol=0.3)
+        assert np.allclose(data[labels == 1].std(axis=0), 3.0, atol=0.3)
+    
+    def test_write_to_memmap(self, tmp_path):
+        path = tmp_path / "blobs.npy"
+        data, _ = make_blobs(n_samples=500, n_features=3, random_state=0, out=path,
+                             chunk_rows=64)
+        assert isinstance(data, np.memmap)
+        assert np.array_equal(np.load(path), make_blobs(n_samples=500, n_features=3,
+                                                        random_state=0, chunk_rows=64)[0])
+    
+    def test_write_labels_to_memmap(self, tmp_path):
+        expected = make_blobs(n_samples=500, random_state=0, chunk_rows=64)[1]
+        _, labels = make_blobs(n_samples=500, random_state=0, chunk_rows=64,
+                               out=tmp_path / "X.npy", labels_out=tmp_path / "y.npy")
+        assert isinstance(labels, np.memmap)
+        assert np.array_equal(np.load(tmp_path / "y.npy"), expected)
+        
+        buffer = np.empty(500, dtype=np.int64)
+        _, labels = make_blobs(n_samples=500, random_state=0, chunk_rows=64, labels_out=buffer)
+        assert labels is buffer
+        assert np.array_equal(buffer, expected)
+    
+    def test_memmap_generation_is_memory_bounded(self, tmp_path):
+        tracemalloc.start()
+        try:
+            make_blobs(n_samples=400_000, n_features=2, chunk_rows=4096,
+                       out=tmp_path / "X.npy", labels_out=tmp_path / "y.npy")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Neither the 6.4 MB of points nor the 1.6 MB of labels live in RAM
+        assert peak < 1_000_000
 
 
 class TestInitializeCentroids:
@@ -47,6 +131,33 @@ class TestInitializeCentroids:
         data = np.random.rand(10, 2)
         with pytest.raises(ValueError):
             initialize_centroids(data, k=15)  # k > n_samples
+    
+    @pytest.mark.parametrize("init", ["k-means++", "k-means||"])
+    def test_seeding_spreads_centroids(self, init):
+        centers = np.array([[0, 0], [10, 10], [0, 10]])
+        rng = np.random.default_rng(0)
+        data = np.vstack([c + 0.1 * rng.normal(size=(50, 2)) for c in centers])
+        centroids = initialize_centroids(data, k=3, init=init, random_state=0)
+        
+        assert centroids.shape == (3, 2)
+        # One seed should land in each of the three tight, well separated blobs
+        labels = assign_clusters(centroids, centers)
+        assert sorted(labels) == [0, 1, 2]
+    
+    def test_kmeans_plusplus_duplicates(self):
+        data = np.zeros((20, 2))
+        centroids = initialize_centroids(data, k=3, init="k-means++", random_state=0)
+        assert np.array_equal(centroids, np.zeros((3, 2)))
+    
+    def test_array_init(self):
+        data = np.random.rand(10, 2)
+        centroids = initialize_centroids(data, k=2, init=data[:2])
+        assert np.array_equal(centroids, data[:2])
+    
+    def test_unknown_init(self):
+        data = np.random.rand(10, 2)
+        with pytest.raises(ValueError):
+            initialize_centroids(data, k=2, init="bogus")
 
 
 class TestAssignClusters:
@@ -78,6 +189,47 @@ class TestAssignClusters:
         assert labels[0] == labels[1]
         assert labels[2] == labels[3]
         assert labels[0] != labels[2]
+    
+    def test_blocked_matches_bruteforce(self):
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(500, 4))
+        centroids = rng.normal(size=(7, 4))
+        expected = np.argmin(
+            ((data[:, np.newaxis] - centroids) ** 2).sum(axis=2), axis=1
+        )
+        
+        labels = assign_clusters(data, centroids, block_rows=64)
+        assert np.array_equal(labels, expected)
+    
+    def test_return_distances(self):
+        rng = np.random.default_rng(1)
+        data = rng.normal(size=(200, 3))
+        centroids = rng.normal(size=(4, 3))
+        labels, distances = assign_clusters(
+            data, centroids, return_distances=True, max_memory_mb=0.001
+        )
+        
+        expected = ((data - centroids[labels]) ** 2).sum(axis=1)
+        assert np.allclose(distances, expected)
+        assert np.all(distances >= 0)
+    
+    def test_labels_only_skips_row_norms(self, monkeypatch):
+        import scripts.kmeans_utils as kmeans_utils
+        data = np.random.rand(100, 3)
+        centroids = data[:4]
+        expected = assign_clusters(data, centroids)
+        calls = []
+        squared_norms = kmeans_utils._squared_norms
+        monkeypatch.setattr(kmeans_utils, "_squared_norms",
+                            lambda arr: calls.append(len(arr)) or squared_norms(arr))
+        assert np.array_equal(assign_clusters(data, centroids), expected)
+        assert calls == [4]  # centroid norms only
+    
+    def test_preserves_float32(self):
+        data = np.random.rand(50, 2).astype(np.float32)
+        centroids = data[:3]
+        _, distances = assign_clusters(data, centroids, return_distances=True)
+        assert distances.dtype == np.float32
 
 
 class TestUpdateCentroids:
@@ -100,6 +252,61 @@ class TestUpdateCentroids:
         # Centroid 1 should be mean of [10,10] and [12,12] = [11,11]
         assert np.allclose(centroids[0], [1, 1])
         assert np.allclose(centroids[1], [11, 11])
+    
+    def test_matches_masked_mean(self):
+        data = np.random.rand(200, 4)
+        labels = np.random.randint(0, 6, 200)
+        labels[:6] = np.arange(6)
+        expected = np.array([data[labels == i].mean(axis=0) for i in range(6)])
+        
+        assert np.allclose(update_centroids(data, labels, k=6), expected)
+    
+    def test_empty_cluster_keeps_old_centroid(self):
+        data = np.array([[0, 0], [2, 2]])
+        labels = np.array([0, 0])
+        old = np.array([[5, 5], [9, 9]])
+        centroids, counts = update_centroids(data, labels, k=2, old_centroids=old,
+                                             return_counts=True)
+        
+        assert np.allclose(centroids, [[1, 1], [9, 9]])
+        assert np.array_equal(counts, [2, 0])
+    
+    def test_empty_cluster_reseeded_from_farthest(self):
+        data = np.array([[0, 0], [1, 0], [10, 0]])
+        labels = np.array([0, 0, 0])
+        centroids = update_centroids(data, labels, k=2, empty_strategy="farthest")
+        
+        assert not np.isnan(centroids).any()
+        assert np.allclose(centroids[1], [10, 0])
+    
+    def test_sample_weight(self):
+        data = np.array([[0, 0], [4, 4]])
+        labels = np.array([0, 0])
+        centroids, counts = update_centroids(data, labels, k=1,
+                                             sample_weight=np.array([3.0, 1.0]),
+                                             return_counts=True)
+        
+        assert np.allclose(centroids[0], [1, 1])
+        assert np.allclose(counts, [4.0])
+    
+    @pytest.mark.parametrize("strategy", ["sparse", "one_hot", "segments", "bincount"])
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    def test_sum_strategies_agree(self, strategy, dtype):
+        import scripts.kmeans_utils as kmeans_utils
+        if strategy == "sparse" and kmeans_utils.sparse is None:
+            pytest.skip("SciPy not installed")
+        rng = np.random.default_rng(0)
+        data = rng.standard_normal((500, 7)).astype(dtype)
+        labels = rng.integers(0, 40, 500)
+        labels[labels == 3] = 4  # leave cluster 3 empty
+        weights = rng.random(500)
+        for w in (None, weights):
+            scale = np.ones(500) if w is None else w
+            expected = np.array([(data[labels == c] * scale[labels == c, None]).sum(axis=0)
+                                 for c in range(40)])
+            sums = getattr(kmeans_utils, f"_cluster_sums_{strategy}")(data, labels, 40, w)
+            assert sums.dtype == np.float64
+            assert np.allclose(sums, expected, atol=1e-4)
 
 
 class TestKmeans:
@@ -133,6 +340,459 @@ class TestKmeans:
         
         # Results should be identical with same seed
         assert np.allclose(centroids1, centroids2)
+    
+    def test_kmeans_return_info(self):
+        data = generate_data()
+        centroids, labels, info = kmeans(data, k=3, init="k-means++",
+                                         random_state=0, return_info=True)
+        
+        assert info["seeding_time"] >= 0
+        assert info["lloyd_time"] >= 0
+        assert 1 <= info["n_iter"] <= 100
+        assert np.isclose(info["inertia"], compute_cluster_inertia(data, centroids, labels))
+
+
+class TestFloat32Path:
+    """Tests that float32 inputs stay float32 end-to-end"""
+    
+    @pytest.mark.parametrize("algorithm", ["lloyd", "elkan", "hamerly"])
+    def test_kmeans_preserves_float32(self, algorithm):
+        data = generate_data(dtype=np.float32)
+        centroids, labels = kmeans(data, k=3, init="k-means++", random_state=0,
+                                   algorithm=algorithm)
+        
+        assert centroids.dtype == np.float32
+        assert update_centroids(data, labels, k=3).dtype == np.float32
+    
+    def test_requested_dtype(self):
+        data = generate_data()
+        centroids, _ = kmeans(data, k=3, random_state=0, dtype=np.float32)
+        assert centroids.dtype == np.float32
+    
+    def test_float32_matches_float64(self):
+        data = generate_data()
+        init = data[[0, 50, 100]]
+        c64, l64 = kmeans(data, k=3, init=init)
+        c32, l32 = kmeans(data, k=3, init=init, dtype=np.float32)
+        
+        assert np.array_equal(l64, l32)
+        assert np.allclose(c64, c32, atol=1e-4)
+        inertia = compute_cluster_inertia(data.astype(np.float32), c32, l32)
+        assert inertia.dtype == np.float64
+        assert np.isclose(inertia, compute_cluster_inertia(data, c64, l64), rtol=1e-5)
+
+
+class TestWeightedKmeans:
+    """Tests for sample weights and compress_duplicates"""
+    
+    def test_compressed_matches_raw(self):
+        base = generate_data()
+        data = np.vstack([base, base[:60], base[:60]])
+        points, weights, inverse = compress_duplicates(data)
+        
+        assert len(points) == 150
+        assert weights.sum() == len(data)
+        assert np.array_equal(points[inverse], data)
+        
+        init = base[[0, 50, 100]]
+        raw_c, raw_l, raw_info = kmeans(data, k=3, init=init, return_info=True)
+        c, labels, info = kmeans(points, k=3, init=init, sample_weight=weights,
+                                 return_info=True)
+        assert np.allclose(c, raw_c)
+        assert np.array_equal(labels[inverse], raw_l)
+        assert np.isclose(info["inertia"], raw_info["inertia"])
+    
+    def test_grid_quantization(self):
+        data = np.array([[0.1, 0.1], [0.3, 0.2], [5.0, 5.0]])
+        points, weights, inverse = compress_duplicates(data, resolution=1.0)
+        
+        assert len(points) == 2
+        assert np.allclose(points[inverse[0]], [0.2, 0.15])
+        assert np.allclose(weights[inverse], [2, 2, 1])
+    
+    def test_weighted_inertia(self):
+        data = np.array([[0, 0], [2, 0]])
+        centroids = np.array([[1, 0]])
+        labels = np.array([0, 0])
+        inertia = compute_cluster_inertia(data, centroids, labels,
+                                          sample_weight=np.array([1.0, 3.0]))
+        assert np.isclose(inertia, 4.0)
+
+
+class TestCoreset:
+    """Tests for coreset construction and kmeans_coreset"""
+    
+    @pytest.fixture
+    def blobs(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(scale=10, size=(4, 3))
+        return np.vstack([c + rng.normal(size=(2500, 3)) for c in centers])
+    
+    def test_coreset_cost_approximates_full_cost(self, blobs):
+        points, weights = build_coreset(blobs, k=4, coreset_size=800, random_state=0)
+        
+        assert points.shape == (800, 3)
+        assert np.isclose(weights.sum(), len(blobs), rtol=0.1)
+        centroids = blobs[[0, 2500, 5000, 7500]]
+        full = compute_cluster_inertia(blobs, centroids, assign_clusters(blobs, centroids))
+        labels = assign_clusters(points, centroids)
+        approx = compute_cluster_inertia(points, centroids, labels, sample_weight=weights)
+        assert np.isclose(approx, full, rtol=0.1)
+    
+    def test_coreset_streams_chunks(self, tmp_path):
+        mmap, _ = make_blobs(400_000, 2, k=4, random_state=0, out=tmp_path / "X.npy")
+        tracemalloc.start()
+        try:
+            points, weights = build_coreset(mmap, k=4, coreset_size=800, seed_size=1000,
+                                            chunk_rows=10_000, random_state=0)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert points.shape == (800, 2)
+        assert np.isclose(weights.sum(), len(mmap), rtol=0.1)
+        # No per-row side arrays: well under one copy of the data
+        assert peak < mmap.nbytes / 4
+    
+    def test_kmeans_coreset(self, blobs):
+        centroids, labels, info = kmeans_coreset(blobs, k=4, coreset_size=400,
+                                                 init="k-means++", n_init=3,
+                                                 compute_labels=True, random_state=0,
+                                                 return_info=True)
+        
+        assert labels.shape == (len(blobs),)
+        assert np.isclose(info["inertia"], compute_cluster_inertia(blobs, centroids, labels))
+        assert np.isclose(info["coreset_inertia"], info["inertia"], rtol=0.2)
+    
+    def test_streaming_inertia_on_memmap(self, tmp_path, blobs):
+        mmap = np.memmap(tmp_path / "X.dat", dtype=np.float64, mode="w+", shape=blobs.shape)
+        mmap[:] = blobs
+        centroids = blobs[:4]
+        labels = assign_clusters(blobs, centroids)
+        
+        inertia = compute_streaming_inertia(mmap, centroids, chunk_rows=1000)
+        assert np.isclose(inertia, compute_cluster_inertia(blobs, centroids, labels))
+
+
+class TestKmeansInstrumentation:
+    """Tests for kmeans callbacks and label-change early stopping"""
+    
+    @pytest.mark.parametrize("algorithm", ["lloyd", "hamerly"])
+    def test_trace_records_iterations(self, algorithm):
+        data = generate_data()
+        trace = KMeansTrace()
+        _, _, info = kmeans(data, k=3, init=data[[0, 1, 2]], algorithm=algorithm,
+                            callback=trace, return_info=True)
+        
+        history = trace.as_arrays()
+        assert len(trace.records) == info["n_iter"]
+        assert history["n_changed"][0] == 150
+        # Lloyd iterations never increase the inertia
+        assert np.all(np.diff(history["inertia"]) <= 1e-9)
+        assert np.all(history["assign_time"] >= 0)
+    
+    def test_callback_can_stop(self):
+        data = generate_data()
+        _, _, info = kmeans(data, k=3, init=data[[0, 1, 2]],
+                            callback=lambda record: record["iteration"] == 2,
+                            return_info=True)
+        assert info["n_iter"] == 2
+    
+    def test_trace_separates_thread_restarts(self):
+        data = generate_data()
+        trace = KMeansTrace()
+        kmeans(data, k=3, n_init=4, n_jobs=4, prune_ratio=None, random_state=0,
+               callback=trace)
+        
+        assert {r["restart"] for r in trace.records} == {0, 1, 2, 3}
+        for restart in range(4):
+            history = trace.as_arrays(restart=restart)
+            assert np.array_equal(history["iteration"], np.arange(1, len(history["iteration"]) + 1))
+            assert np.all(np.diff(history["inertia"]) <= 1e-9)
+    
+    def test_callback_stops_only_calling_restart(self):
+        data = generate_data()
+        trace = KMeansTrace()
+        
+        def stop_first(record):
+            trace(record)
+            return record["restart"] == 0
+        
+        kmeans(data, k=3, n_init=3, n_jobs=3, prune_ratio=None, random_state=0,
+               callback=stop_first)
+        iterations = [len(trace.as_arrays(restart=i)["iteration"]) for i in range(3)]
+        assert iterations[0] == 1
+        assert min(iterations[1:]) > 1
+    
+    def test_label_change_tol(self):
+        data = generate_data()
+        init = data[[0, 1, 2]]
+        _, _, full = kmeans(data, k=3, init=init, tol=0, return_info=True)
+        _, _, early = kmeans(data, k=3, init=init, tol=0, label_change_tol=5,
+                             return_info=True)
+        assert 2 <= early["n_iter"] <= full["n_iter"]
+
+
+class TestKmeansRestarts:
+    """Tests for kmeans with n_init restarts"""
+    
+    def test_returns_best_restart(self):
+        data = generate_data()
+        _, _, info = kmeans(data, k=3, n_init=4, random_state=0, prune_ratio=None,
+                            return_info=True)
+        
+        assert info["n_pruned"] == 0
+        assert len(info["inertias"]) == 4
+        assert info["inertia"] == min(info["inertias"])
+    
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_parallel_matches_serial(self, executor):
+        data = generate_data()
+        expected, _ = kmeans(data, k=3, n_init=3, random_state=5, prune_ratio=None)
+        centroids, _ = kmeans(data, k=3, n_init=3, random_state=5, prune_ratio=None,
+                              n_jobs=2, executor=executor)
+        
+        assert np.allclose(centroids, expected)
+    
+    def test_pruning_keeps_a_solution(self):
+        data = generate_data()
+        centroids, labels, info = kmeans(data, k=3, n_init=6, random_state=0,
+                                         prune_ratio=1.0, return_info=True)
+        
+        assert centroids.shape == (3, 2)
+        assert info["inertias"].count(None) == info["n_pruned"] < 6
+    
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_pruning_under_parallel_pool(self, executor):
+        data, _ = make_blobs(n_samples=20000, n_features=2, k=12, cluster_std=0.3,
+                             random_state=0)
+        full = kmeans(data, k=12, n_init=8, random_state=0, prune_ratio=None,
+                      return_info=True)[2]
+        _, _, info = kmeans(data, k=12, n_init=8, n_jobs=8, executor=executor,
+                            random_state=0, prune_ratio=1.05, return_info=True)
+        
+        assert info["n_pruned"] > 0
+        assert np.isclose(info["inertia"], full["inertia"])
+    
+    def test_prune_ratio_below_one_rejected(self):
+        with pytest.raises(ValueError):
+            kmeans(generate_data(), k=3, n_init=2, prune_ratio=0.5)
+
+
+class TestAcceleratedKmeans:
+    """Tests for the elkan/hamerly kmeans algorithms"""
+    
+    @pytest.mark.parametrize("algorithm", ["elkan", "hamerly"])
+    def test_matches_lloyd(self, algorithm):
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(300, 3)) + rng.integers(0, 3, size=(300, 1)) * 4
+        init = data[:5]
+        
+        expected_c, expected_l = kmeans(data, k=5, init=init)
+        centroids, labels = kmeans(data, k=5, init=init, algorithm=algorithm)
+        
+        assert np.array_equal(labels, expected_l)
+        assert np.allclose(centroids, expected_c)
+    
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @pytest.mark.parametrize("algorithm", ["elkan", "hamerly"])
+    def test_matches_lloyd_many_clusters(self, algorithm, dtype):
+        # Enough clusters that later iterations only revisit a few rows
+        data, _ = make_blobs(3000, 8, k=40, random_state=1, dtype=dtype)
+        init = data[:40]
+        
+        expected_c, expected_l = kmeans(data, k=40, init=init, max_iters=50)
+        centroids, labels, info = kmeans(data, k=40, init=init, max_iters=50,
+                                         algorithm=algorithm, return_info=True)
+        
+        assert np.array_equal(labels, expected_l)
+        assert np.allclose(centroids, expected_c)
+        assert info["distances_skipped"][-1] > 0.5 * len(data) * 40
+    
+    @pytest.mark.parametrize("algorithm", ["elkan", "hamerly"])
+    def test_distances_skipped(self, algorithm):
+        data = generate_data()
+        _, labels, info = kmeans(data, k=3, init="k-means++", random_state=0,
+                                 algorithm=algorithm, return_info=True)
+        
+        skipped = info["distances_skipped"]
+        assert len(skipped) == info["n_iter"]
+        assert skipped[0] == 0
+        assert info["n_iter"] == 1 or sum(skipped[1:]) > 0
+        assert all(0 <= s <= data.shape[0] * 3 for s in skipped)
+    
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            kmeans(generate_data(), k=3, algorithm="bogus")
+
+
+class TestMinibatchKmeans:
+    """Tests for minibatch_kmeans function"""
+    
+    def test_recovers_clusters(self):
+        data = generate_data()
+        centroids, labels = minibatch_kmeans(data, k=3, batch_size=32, random_state=0)
+        
+        assert centroids.shape == (3, 2)
+        assert labels.shape == (150,)
+        # Each true blob of 50 points should end up in a single cluster
+        for start in (0, 50, 100):
+            assert len(np.unique(labels[start:start + 50])) == 1
+    
+    def test_skip_final_labels(self):
+        data = generate_data()
+        centroids, labels = minibatch_kmeans(data, k=3, compute_labels=False, random_state=0)
+        assert labels is None
+        assert centroids.shape == (3, 2)
+    
+    def test_reproducible(self):
+        data = generate_data()
+        centroids1, _ = minibatch_kmeans(data, k=3, batch_size=16, random_state=7)
+        centroids2, _ = minibatch_kmeans(data, k=3, batch_size=16, random_state=7)
+        assert np.allclose(centroids1, centroids2)
+
+
+class TestKmeansMemmap:
+    """Tests for kmeans_memmap function"""
+    
+    def test_matches_in_memory_kmeans(self, tmp_path):
+        data = generate_data()
+        mmap = np.memmap(tmp_path / "X.dat", dtype=np.float64, mode="w+", shape=data.shape)
+        mmap[:] = data
+        mmap.flush()
+        init = data[[0, 50, 100]]
+        
+        expected_c, expected_l = kmeans(data, k=3, init=init)
+        centroids, labels = kmeans_memmap(
+            np.memmap(tmp_path / "X.dat", dtype=np.float64, mode="r", shape=data.shape),
+            k=3, init=init, chunk_rows=32, labels_out=tmp_path / "labels.dat",
+        )
+        
+        assert np.allclose(centroids, expected_c)
+        assert isinstance(labels, np.memmap)
+        assert np.array_equal(labels, expected_l)
+        stored = np.memmap(tmp_path / "labels.dat", dtype=np.int32, mode="r")
+        assert np.array_equal(stored, expected_l)
+    
+    def test_return_info(self):
+        data = generate_data().astype(np.float32)
+        centroids, labels, info = kmeans_memmap(data, k=3, random_state=0, return_info=True)
+        
+        assert labels.shape == (150,)
+        assert np.isclose(info["inertia"], compute_cluster_inertia(data, centroids, labels),
+                          rtol=1e-3)
+
+
+class TestKmeansDataParallel:
+    """Tests for kmeans_data_parallel function"""
+    
+    def test_matches_serial_kmeans(self):
+        data = generate_data()
+        init = data[[0, 50, 100]]
+        expected_c, expected_l = kmeans(data, k=3, init=init)
+        
+        centroids, labels, info = kmeans_data_parallel(data, k=3, n_jobs=2, init=init,
+                                                       return_info=True)
+        assert np.allclose(centroids, expected_c)
+        assert np.array_equal(labels, expected_l)
+        assert np.isclose(info["inertia"], compute_cluster_inertia(data, centroids, labels))
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                        reason="patched worker only reaches forked children")
+    def test_killed_worker_raises_instead_of_hanging(self, monkeypatch):
+        import scripts.kmeans_utils as kmeans_utils
+        worker = kmeans_utils._data_parallel_worker
+        
+        def dying_worker(rank, *args):
+            if rank == 0:
+                os._exit(9)  # no Python exception, as with an OOM kill
+            worker(rank, *args)
+        
+        monkeypatch.setattr(kmeans_utils, "_data_parallel_worker", dying_worker)
+        with pytest.raises(RuntimeError, match="exited"):
+            kmeans_data_parallel(generate_data(), k=3, n_jobs=2, timeout=60)
+    
+    def test_timeout_raises(self):
+        # A zero timeout breaks the barrier before the workers can reach it
+        with pytest.raises(RuntimeError):
+            kmeans_data_parallel(generate_data(), k=3, n_jobs=2, timeout=0)
+
+
+class TestKMeansModel:
+    """Tests for the KMeansModel class"""
+    
+    def test_predict_matches_assign_clusters(self):
+        rng = np.random.default_rng(0)
+        centroids = rng.normal(size=(8, 3))
+        data = rng.normal(size=(500, 3))
+        model = KMeansModel(centroids, tree="none", block_rows=64)
+        
+        labels, distances = model.predict(data, return_distances=True)
+        expected_l, expected_d = assign_clusters(data, centroids, return_distances=True)
+        assert np.array_equal(labels, expected_l)
+        assert np.allclose(distances, expected_d)
+        # Repeated calls reuse the scratch buffer and give the same answer
+        assert np.array_equal(model.predict(data[:10]), expected_l[:10])
+    
+    def test_transform(self):
+        centroids = np.array([[0.0, 0.0], [3.0, 4.0]])
+        model = KMeansModel(centroids)
+        distances = model.transform(np.array([[0.0, 0.0]]))
+        assert np.allclose(distances, [[0.0, 5.0]])
+    
+    def test_kdtree_predict(self):
+        pytest.importorskip("scipy")
+        rng = np.random.default_rng(1)
+        centroids = rng.normal(size=(100, 2))
+        data = rng.normal(size=(300, 2))
+        model = KMeansModel(centroids, tree="auto")
+        
+        assert model._tree is not None
+        assert np.array_equal(model.predict(data), assign_clusters(data, centroids))
+    
+    def test_save_load_roundtrip(self, tmp_path):
+        model = KMeansModel.fit(generate_data(), k=3, random_state=0)
+        model.save(tmp_path / "model.npz")
+        loaded = KMeansModel.load(tmp_path / "model.npz")
+        
+        assert np.array_equal(loaded.centroids, model.centroids)
+        assert np.array_equal(loaded.predict(generate_data()), model.predict(generate_data()))
+
+
+class TestOnlineKMeans:
+    """Tests for the OnlineKMeans class"""
+    
+    def test_running_mean_matches_full_update(self):
+        data = generate_data()
+        model = OnlineKMeans(k=3, random_state=0)
+        model.partial_fit(data[:2])  # buffered until k rows arrive
+        assert model.centroids is None
+        model.partial_fit(data[2:3])
+        seeds = model.centroids.copy()
+        
+        for start in range(3, 150, 25):
+            model.partial_fit(data[start:start + 25])
+        
+        assert model.n_seen == 150
+        assert np.isclose(model.counts.sum(), 150)
+        assert model.predict(data).shape == (150,)
+        assert not np.allclose(model.centroids, seeds)
+    
+    def test_single_cluster_is_exact_mean(self):
+        data = np.random.rand(100, 2)
+        model = OnlineKMeans(k=1, random_state=0)
+        for start in range(0, 100, 10):
+            model.partial_fit(data[start:start + 10])
+        assert np.allclose(model.centroids[0], data.mean(axis=0))
+    
+    def test_decay_tracks_drift(self):
+        model = OnlineKMeans(k=1, decay=0.5, random_state=0)
+        for _ in range(20):
+            model.partial_fit(np.zeros((10, 2)))
+        for _ in range(20):
+            model.partial_fit(np.ones((10, 2)))
+        assert np.allclose(model.centroids[0], [1, 1], atol=1e-3)
+        assert isinstance(model.to_model(), KMeansModel)
 
 
 class TestComputeInertia:
@@ -164,6 +824,120 @@ class TestComputeInertia:
         # Inertia = (0-1)^2 + (2-1)^2 + (10-11)^2 + (12-11)^2 = 1 + 1 + 1 + 1 = 4
         inertia = compute_cluster_inertia(data, centroids, labels)
         assert np.isclose(inertia, 4.0)
+    
+    def test_inertia_from_distances(self):
+        data = np.random.rand(100, 2)
+        centroids = np.random.rand(3, 2)
+        labels, distances = assign_clusters(data, centroids, return_distances=True)
+        
+        inertia = compute_cluster_inertia(data, centroids, labels, distances=distances)
+        assert np.isclose(inertia, compute_cluster_inertia(data, centroids, labels))
+
+
+class TestClusterQualityMetrics:
+    """Tests for silhouette, Davies-Bouldin and Calinski-Harabasz scores"""
+    
+    @pytest.fixture
+    def clustering(self):
+        data = generate_data()
+        _, labels = kmeans(data, k=3, init=data[[0, 50, 100]])
+        return data, labels
+    
+    def test_silhouette_matches_bruteforce(self, clustering):
+        data, labels = clustering
+        dists = np.sqrt(((data[:, np.newaxis] - data) ** 2).sum(axis=2))
+        expected = []
+        for i, own in enumerate(labels):
+            same = labels == own
+            a = dists[i, same].sum() / (same.sum() - 1)
+            b = min(dists[i, labels == c].mean() for c in set(labels) - {own})
+            expected.append((b - a) / max(a, b))
+        
+        score = silhouette_score(data, labels, max_memory_mb=0.01)
+        assert np.isclose(score, np.mean(expected))
+        # A tiny budget splits the data into many column blocks as well
+        assert np.isclose(silhouette_score(data, labels, max_memory_mb=0.0005), np.mean(expected))
+
+    def test_silhouette_does_not_copy_data(self):
+        rng = np.random.default_rng(0)
+        data = rng.standard_normal((100_000, 32))
+        labels = rng.integers(0, 5, len(data))
+        tracemalloc.start()
+        try:
+            silhouette_score(data, labels, sample_size=50, max_memory_mb=1, random_state=0)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # O(n) index/norm arrays only; a copy of X alone would be 25.6 MB
+        assert peak < data.nbytes / 2
+    
+    def test_sampled_silhouette_interval(self, clustering):
+        data, labels = clustering
+        exact = silhouette_score(data, labels)
+        estimate, (low, high) = silhouette_score(data, labels, sample_size=60,
+                                                 random_state=0)
+        
+        assert low <= estimate <= high
+        assert low - 0.05 <= exact <= high + 0.05
+    
+    def test_silhouette_sample_covering_all_rows(self, clustering):
+        data, labels = clustering
+        exact = silhouette_score(data, labels)
+        estimate, (low, high) = silhouette_score(data, labels, sample_size=len(data) + 1)
+        
+        assert estimate == low == high == exact
+    
+    def test_davies_bouldin(self, clustering):
+        data, labels = clustering
+        centroids = np.array([data[labels == i].mean(axis=0) for i in range(3)])
+        scatter = np.array([np.linalg.norm(data[labels == i] - centroids[i], axis=1).mean()
+                            for i in range(3)])
+        ratios = [max((scatter[i] + scatter[j]) / np.linalg.norm(centroids[i] - centroids[j])
+                      for j in range(3) if j != i) for i in range(3)]
+        
+        assert np.isclose(davies_bouldin_score(data, labels, chunk_rows=16), np.mean(ratios))
+    
+    def test_calinski_harabasz(self, clustering):
+        data, labels = clustering
+        centroids = np.array([data[labels == i].mean(axis=0) for i in range(3)])
+        within = compute_cluster_inertia(data, centroids, labels)
+        between = sum((labels == i).sum() * ((centroids[i] - data.mean(axis=0)) ** 2).sum()
+                      for i in range(3))
+        expected = between / 2 / (within / (150 - 3))
+        
+        assert np.isclose(calinski_harabasz_score(data, labels, chunk_rows=16), expected)
+    
+    def test_single_cluster_rejected(self):
+        data = np.random.rand(10, 2)
+        with pytest.raises(ValueError):
+            silhouette_score(data, np.zeros(10, dtype=int))
+
+
+class TestElbowSweep:
+    """Tests for compute_inertia function"""
+    
+    def test_inertia_decreases_with_warm_start(self):
+        data = generate_data()
+        inertias, info = compute_inertia(data, range(1, 6), warm_start=True,
+                                         random_state=0, return_info=True)
+        
+        assert len(inertias) == 5
+        # Splitting a cluster can only lower the inertia of the seed
+        assert all(a >= b for a, b in zip(inertias, inertias[1:]))
+        assert len(info["wall_times"]) == len(info["n_iters"]) == 5
+    
+    def test_parallel_sweep(self):
+        data = generate_data()
+        inertias, info = compute_inertia(data, [2, 3, 4], n_jobs=2, random_state=0,
+                                         return_info=True)
+        serial = compute_inertia(data, [2, 3, 4], random_state=0)
+        
+        assert np.allclose(inertias, serial)
+        assert all(n >= 1 for n in info["n_iters"])
+    
+    def test_warm_start_requires_serial(self):
+        with pytest.raises(ValueError):
+            compute_inertia(generate_data(), range(2, 4), n_jobs=2, warm_start=True)
 
 
 if __name__ == '__main__':